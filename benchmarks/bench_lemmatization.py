@@ -0,0 +1,84 @@
+"""
+Speed and agreement benchmark: lookup-table ("fast") lemmatization versus the full SpaCy pipeline.
+
+Needs the SpaCy model for the language and spacy-lookups-data (pip install LinguaCraft[fast]):
+
+    python benchmarks/bench_lemmatization.py --language de book1.txt book2.txt
+"""
+import argparse
+import time
+
+from linguacraft.text_processing import ensure_lookup_pipeline, ensure_spacy_model, normalize_words, read_text_file, tokenize_text
+
+SAMPLE_TEXTS = {
+    "en": "The children were running through the gardens while their parents watched the boats sailing "
+          "across the bay. Later they ate apples, talked about the stories they had read, and went to bed early.",
+}
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def strip_verb_prefix(lemma):
+    """The full English pipeline marks verbs as 'to <lemma>'; the lookup tables cannot."""
+    return lemma[3:] if lemma.startswith("to ") else lemma
+
+
+def compare(text, language):
+    full_tokens, full_tokenize = timed(lambda: tokenize_text(text, language))
+    full_lemmas, full_normalize = timed(lambda: normalize_words(full_tokens, language))
+    fast_tokens, fast_tokenize = timed(lambda: tokenize_text(text, language, fast=True))
+    fast_lemmas, fast_normalize = timed(lambda: normalize_words(fast_tokens, language, fast=True))
+
+    # Token-level agreement: lemmatize the same tokens both ways
+    aligned_fast = normalize_words(full_tokens, language, fast=True)
+    full_compared = [strip_verb_prefix(lemma.lower()) for lemma in full_lemmas]
+    if len(aligned_fast) == len(full_compared):
+        matches = sum(1 for a, b in zip(full_compared, aligned_fast) if a == b.lower())
+        token_agreement = matches / len(full_compared) if full_compared else 1.0
+    else:
+        token_agreement = None
+
+    # Agreement of the resulting candidate lists (what the learner would see)
+    full_set = set(full_compared)
+    fast_set = {lemma.lower() for lemma in fast_lemmas}
+    set_agreement = len(full_set & fast_set) / len(full_set | fast_set) if full_set | fast_set else 1.0
+
+    return {
+        "tokens": len(full_tokens),
+        "full": full_tokenize + full_normalize,
+        "fast": fast_tokenize + fast_normalize,
+        "token_agreement": token_agreement,
+        "set_agreement": set_agreement,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fast lookup lemmatization against the full pipeline.")
+    parser.add_argument("files", nargs="*", help="Text files to analyze (default: a built-in English sample)")
+    parser.add_argument("--language", default="en", help="Language code of the texts")
+    args = parser.parse_args()
+
+    texts = [(path, read_text_file(path)) for path in args.files]
+    if not texts:
+        texts = [("<sample>", SAMPLE_TEXTS.get(args.language, SAMPLE_TEXTS["en"]))]
+
+    # Load both pipelines up front so model loading is not timed
+    ensure_spacy_model(args.language)
+    if ensure_lookup_pipeline(args.language) is None:
+        raise SystemExit(f"No lookup tables for '{args.language}'. Install spacy-lookups-data.")
+
+    print(f"{'text':<30} {'tokens':>8} {'full s':>9} {'fast s':>9} {'speedup':>8} {'token agr':>10} {'set agr':>8}")
+    for name, text in texts:
+        result = compare(text, args.language)
+        token_agreement = f"{result['token_agreement']:.1%}" if result["token_agreement"] is not None else "n/a"
+        speedup = result["full"] / result["fast"] if result["fast"] else float("inf")
+        print(f"{name[-30:]:<30} {result['tokens']:>8} {result['full']:>9.3f} {result['fast']:>9.3f} "
+              f"{speedup:>7.1f}x {token_agreement:>10} {result['set_agreement']:>8.1%}")
+
+
+if __name__ == "__main__":
+    main()
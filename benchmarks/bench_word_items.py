@@ -0,0 +1,71 @@
+"""
+Memory and speed benchmark: WordItemStore versus the previous per-instance WordItem objects.
+
+    python benchmarks/bench_word_items.py --words 30000
+"""
+import argparse
+import random
+import string
+import time
+import tracemalloc
+
+from linguacraft.word_items import WordItemStore
+
+
+class LegacyWordItem:
+    """The previous representation: one regular object (with __dict__) per word."""
+    def __init__(self, word):
+        self.word = word
+        self.is_known = False
+        self.translation = "---"
+        self.definition = "---"
+
+
+def make_words(count):
+    rng = random.Random(42)
+    return ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 12))) for _ in range(count)]
+
+
+def measure(build):
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def timed(func, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark WordItem storage.")
+    parser.add_argument("--words", type=int, default=30000, help="Number of candidate words")
+    args = parser.parse_args()
+
+    words = make_words(args.words)
+    toggled = random.Random(7).sample(range(args.words), args.words // 3)
+
+    legacy, legacy_size = measure(lambda: [LegacyWordItem(word) for word in words])
+    store, store_size = measure(lambda: WordItemStore(words))
+    for index in toggled:
+        legacy[index].is_known = True
+        store.toggle_status(index, known=True)
+
+    legacy_time = timed(lambda: ([item.word for item in legacy if item.is_known],
+                                 [item.word for item in legacy if not item.is_known]))
+    store_time = timed(lambda: (store.known_words(), store.unknown_words()))
+    assert sorted(store.known_words()) == sorted(item.word for item in legacy if item.is_known)
+
+    print(f"Words:                     {args.words} ({len(toggled)} marked known, word strings excluded)")
+    print(f"Memory, WordItem objects:  {legacy_size / 1024:.0f} KiB")
+    print(f"Memory, WordItemStore:     {store_size / 1024:.0f} KiB")
+    print(f"Known/unknown extraction:  {legacy_time * 1000:.2f} ms -> {store_time * 1000:.2f} ms "
+          f"({legacy_time / store_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
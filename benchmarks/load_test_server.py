@@ -0,0 +1,104 @@
+"""
+Load test for `linguacraft serve`.
+
+Start the server first, e.g.:
+    linguacraft serve --preload en --workers 8
+then run:
+    python benchmarks/load_test_server.py --requests 500 --concurrency 32 --text input.txt
+"""
+import argparse
+import http.client
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+SAMPLE_TEXT = (
+    "The quick brown fox jumps over the lazy dog. "
+    "Curiosity keeps the old lighthouse keeper awake through the stormy nights, "
+    "while the villagers gather driftwood and whisper about forgotten shipwrecks."
+)
+
+_local = threading.local()
+
+
+def get_connection(host, port):
+    """One keep-alive connection per client thread."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = http.client.HTTPConnection(host, port, timeout=120)
+        _local.conn = conn
+    return conn
+
+
+def send_request(host, port, path, payload):
+    """Send one request. Returns (status, latency in seconds)."""
+    body = json.dumps(payload).encode("utf-8")
+    start = time.perf_counter()
+    try:
+        conn = get_connection(host, port)
+        conn.request("POST", path, body=body, headers={"Content-Type": "application/json"})
+        response = conn.getresponse()
+        response.read()
+        status = response.status
+    except (OSError, http.client.HTTPException):
+        _local.conn = None
+        status = 0
+    return (status, time.perf_counter() - start)
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(pct / 100 * len(values)) - 1))
+    return values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the LinguaCraft analysis server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--requests", type=int, default=200, help="Total number of requests to send")
+    parser.add_argument("--concurrency", type=int, default=16, help="Number of concurrent clients")
+    parser.add_argument("--endpoint", choices=["analyze", "translate"], default="analyze")
+    parser.add_argument("--text", help="Path to a text file to submit (default: built-in sample)")
+    parser.add_argument("--language", default="en", help="Language of the submitted text")
+    parser.add_argument("--target-language", default="uk", help="Target language for /translate")
+    args = parser.parse_args()
+
+    if args.text:
+        with open(args.text, "r", encoding="utf-8") as f:
+            text = f.read()
+    else:
+        text = SAMPLE_TEXT
+
+    if args.endpoint == "analyze":
+        payload = {"text": text, "language": args.language}
+    else:
+        payload = {"words": sorted(set(text.lower().split()))[:50], "target_language": args.target_language}
+
+    path = f"/{args.endpoint}"
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(lambda _: send_request(args.host, args.port, path, payload), range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for (status, latency) in results if status == 200]
+    statuses = {}
+    for (status, _) in results:
+        statuses[status] = statuses.get(status, 0) + 1
+
+    print(f"Requests:     {args.requests} ({args.concurrency} concurrent) to {path}")
+    print(f"Elapsed:      {elapsed:.2f} s")
+    print(f"Throughput:   {len(latencies) / elapsed:.1f} successful req/s")
+    print(f"Statuses:     {dict(sorted(statuses.items()))}  (503 = backpressure, 0 = connection error)")
+    if latencies:
+        print(f"Latency mean: {statistics.mean(latencies) * 1000:.1f} ms")
+        for pct in (50, 95, 99):
+            print(f"Latency p{pct}:  {percentile(latencies, pct) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
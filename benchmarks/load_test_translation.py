@@ -0,0 +1,122 @@
+"""
+Load test for the translation layer against the local provider stand-in (provider_stub.py).
+
+Starts the stub in-process, points linguacraft.translation at it and calls the provider
+functions concurrently:
+
+    python benchmarks/load_test_translation.py --target google --words 1000 --concurrency 32 --rate-limit 100
+    python benchmarks/load_test_translation.py --target bulk --words 2000 --batch-size 100 --error-rate 0.02
+
+Reports throughput, p50/p95/p99 latency, failures and wasted retries (provider calls beyond one per task).
+"""
+import argparse
+import logging
+import os
+import random
+import string
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from load_test_server import percentile
+from provider_stub import ProviderStub, add_stub_arguments, make_server
+
+TARGETS = ("google", "microsoft", "definition", "fetch", "bulk")
+FAILURE_PREFIXES = ("Translation not available", "Definition not available", "Error fetching")
+
+
+def make_words(count):
+    rng = random.Random(1)
+    return ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10))) for _ in range(count)]
+
+
+def configure_environment(base_url):
+    """Point the provider endpoints at the stub. Must run before linguacraft.translation is imported."""
+    os.environ["GOOGLE_TRANSLATE_ENDPOINT"] = f"{base_url}/language/translate/v2"
+    os.environ["GOOGLE_TRANSLATE_API_KEY"] = "stub"
+    os.environ["MICROSOFT_TRANSLATOR_ENDPOINT"] = base_url
+    os.environ["MICROSOFT_TRANSLATOR_API_KEY"] = "stub"
+    os.environ["OPENAI_BASE_URL"] = f"{base_url}/v1"
+    os.environ["OPENAI_API_KEY"] = "stub"
+
+
+def make_tasks(target, words, target_language, batch_size):
+    """Returns (tasks, calls per task): each task is a zero-argument callable returning the provider result."""
+    from linguacraft import translation, translation_bulk
+
+    if target == "google":
+        return [lambda word=word: translation.translate_word_google(word, target_language) for word in words], 1
+    if target == "microsoft":
+        return [lambda word=word: translation.translate_word_microsoft(word, target_language) for word in words], 1
+    if target == "definition":
+        return [lambda word=word: translation.get_definition(word) for word in words], 1
+    if target == "fetch":
+        # What fetch_translation does per word, without writing output.txt
+        def fetch(word):
+            definition = translation.get_definition(word)
+            translated = translation.translate_word(word, target_language, provider="google")
+            return definition if definition.startswith(FAILURE_PREFIXES) else translated
+        return [lambda word=word: fetch(word) for word in words], 2
+    batches = [words[i:i + batch_size] for i in range(0, len(words), batch_size)]
+    return [lambda batch=batch: translation_bulk.get_definition_bulk(batch, "en", target_language) for batch in batches], 1
+
+
+def run_task(task):
+    start = time.perf_counter()
+    try:
+        result = task()
+        failed = not isinstance(result, str) or result.startswith(FAILURE_PREFIXES)
+    except Exception:
+        failed = True
+    return (failed, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the translation layer against simulated providers.")
+    parser.add_argument("--target", choices=TARGETS, default="google",
+                        help="google/microsoft: translate_word_*, definition: get_definition, "
+                             "fetch: definition + translation per word, bulk: get_definition_bulk")
+    parser.add_argument("--words", type=int, default=500, help="Number of words to process")
+    parser.add_argument("--concurrency", type=int, default=16, help="Number of concurrent callers")
+    parser.add_argument("--batch-size", type=int, default=50, help="Words per get_definition_bulk call")
+    parser.add_argument("--target-language", default="uk")
+    parser.add_argument("--port", type=int, default=0, help="Port for the stub (default: any free port)")
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+    # Provider failures are expected here and counted below; keep the per-word error logs quiet
+    logging.disable(logging.ERROR)
+
+    stub = ProviderStub(args.latency, args.error_rate, args.rate_limit, args.retry_after, args.seed)
+    server = make_server("127.0.0.1", args.port, stub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    configure_environment(base_url)
+
+    tasks, calls_per_task = make_tasks(args.target, make_words(args.words), args.target_language, args.batch_size)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(run_task, tasks))
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    stats = stub.stats
+    provider_requests = sum(counters["requests"] for counters in stats.values())
+    rate_limited = sum(counters["rate_limited"] for counters in stats.values())
+    errors = sum(counters["errors"] for counters in stats.values())
+    wasted = max(0, provider_requests - len(tasks) * calls_per_task)
+
+    latencies = [latency for (_, latency) in results]
+    failures = sum(1 for (failed, _) in results if failed)
+    print(f"Target:           {args.target} ({args.words} words, {len(tasks)} tasks, {args.concurrency} concurrent)")
+    print(f"Provider:         latency {args.latency}, error rate {args.error_rate}, rate limit {f'{args.rate_limit} req/s' if args.rate_limit else 'off'}")
+    print(f"Elapsed:          {elapsed:.2f} s")
+    print(f"Throughput:       {args.words / elapsed:.1f} words/s, {len(tasks) / elapsed:.1f} tasks/s")
+    for pct in (50, 95, 99):
+        print(f"Latency p{pct}:      {percentile(latencies, pct) * 1000:.1f} ms")
+    print(f"Failed tasks:     {failures}")
+    print(f"Provider calls:   {provider_requests} ({rate_limited} rate limited, {errors} errors)")
+    print(f"Wasted retries:   {wasted}")
+
+
+if __name__ == "__main__":
+    main()
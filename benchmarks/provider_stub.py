@@ -0,0 +1,248 @@
+"""
+Local stand-in for the translation and LLM providers used by linguacraft.translation.
+
+Mimics the Google Translate v2, Microsoft Translator and OpenAI chat-completions endpoints
+with configurable latency, error rate and 429 rate limiting:
+
+    python benchmarks/provider_stub.py --port 8766 --latency lognormal:0.08,0.5 --error-rate 0.01 --rate-limit 50
+
+Point LinguaCraft at it with:
+    GOOGLE_TRANSLATE_ENDPOINT=http://127.0.0.1:8766/language/translate/v2
+    MICROSOFT_TRANSLATOR_ENDPOINT=http://127.0.0.1:8766
+    OPENAI_BASE_URL=http://127.0.0.1:8766/v1
+
+GET /__stats returns per-endpoint counters, POST /__reset clears them.
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def parse_latency(spec):
+    """
+    Parses a latency distribution into a sampling function returning seconds.
+    Formats: 'fixed:S', 'uniform:MIN,MAX', 'lognormal:MEDIAN,SIGMA'.
+    """
+    kind, _, values = spec.partition(":")
+    params = [float(value) for value in values.split(",") if value]
+    if kind == "fixed" and len(params) == 1:
+        return lambda: params[0]
+    if kind == "uniform" and len(params) == 2:
+        return lambda: random.uniform(params[0], params[1])
+    if kind == "lognormal" and len(params) == 2:
+        mu = math.log(params[0])
+        return lambda: random.lognormvariate(mu, params[1])
+    raise ValueError(f"Invalid latency spec '{spec}'. Use fixed:S, uniform:MIN,MAX or lognormal:MEDIAN,SIGMA.")
+
+
+class TokenBucket:
+    """Simple token bucket: `rate` requests per second with a burst of `rate`."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class ProviderStub:
+    """Behaviour and counters shared by all request handlers."""
+
+    def __init__(self, latency="fixed:0.05", error_rate=0.0, rate_limit=0.0, retry_after=1.0, seed=None):
+        self.sample_latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.bucket = TokenBucket(rate_limit) if rate_limit > 0 else None
+        self.retry_after = retry_after
+        self.lock = threading.Lock()
+        self.stats = {}
+        if seed is not None:
+            random.seed(seed)
+
+    def count(self, endpoint, outcome):
+        with self.lock:
+            counters = self.stats.setdefault(endpoint, {"requests": 0, "ok": 0, "rate_limited": 0, "errors": 0})
+            counters["requests"] += 1
+            counters[outcome] += 1
+
+    def reset(self):
+        with self.lock:
+            self.stats = {}
+
+
+def fake_translation(word, target):
+    return f"{word[::-1]}-{target}"
+
+
+def words_from_prompt(prompt):
+    """Extracts the word list from a get_definition_bulk prompt (lines between the header and the format hint)."""
+    lines = prompt.split("\n")
+    words = []
+    for line in lines[1:]:
+        if not line.strip():
+            break
+        words.append(line.split(" | ", 1)[0].strip())  # Drop the optional example sentence
+    return words
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    stub = None  # ProviderStub, set by make_server
+
+    def log_message(self, format, *args):
+        pass  # Keep the load test output readable
+
+    def do_GET(self):
+        self.handle_request("GET")
+
+    def do_POST(self):
+        self.handle_request("POST")
+
+    def handle_request(self, method):
+        parsed = urllib.parse.urlparse(self.path)
+        query = urllib.parse.parse_qs(parsed.query)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+
+        if parsed.path == "/__stats":
+            return self.send_json(200, self.stub.stats)
+        if parsed.path == "/__reset":
+            self.stub.reset()
+            return self.send_json(200, {"status": "reset"})
+
+        if parsed.path.endswith("/language/translate/v2"):
+            endpoint, handler = "google", self.google
+        elif parsed.path.endswith("/translate"):
+            endpoint, handler = "microsoft", self.microsoft
+        elif parsed.path.endswith("/chat/completions"):
+            endpoint, handler = "openai", self.openai
+        else:
+            return self.send_json(404, {"error": f"No route for {method} {parsed.path}"})
+
+        if self.stub.bucket is not None and not self.stub.bucket.take():
+            self.stub.count(endpoint, "rate_limited")
+            return self.send_json(429, {"error": {"message": "Rate limit exceeded", "type": "rate_limit"}}, {
+                "Retry-After": str(max(1, round(self.stub.retry_after))),
+                "retry-after-ms": str(int(self.stub.retry_after * 1000)),
+            })
+        time.sleep(self.stub.sample_latency())
+        if random.random() < self.stub.error_rate:
+            self.stub.count(endpoint, "errors")
+            return self.send_json(500, {"error": {"message": "Simulated provider error", "type": "server_error"}})
+        self.stub.count(endpoint, "ok")
+        handler(query, body)
+
+    def google(self, query, body):
+        if body:
+            query.update(urllib.parse.parse_qs(body.decode("utf-8")))
+        target = query.get("target", ["en"])[0]
+        translations = [{"translatedText": fake_translation(word, target)} for word in query.get("q", [])]
+        self.send_json(200, {"data": {"translations": translations}})
+
+    def microsoft(self, query, body):
+        items = json.loads(body or b"[]")
+        targets = query.get("to", ["en"])
+        result = [{"translations": [{"text": fake_translation(item["Text"], target), "to": target} for target in targets]}
+                  for item in items]
+        self.send_json(200, result)
+
+    def openai(self, query, body):
+        request = json.loads(body or b"{}")
+        prompt = request.get("messages", [{}])[-1].get("content", "")
+        words = words_from_prompt(prompt)
+        if words:
+            content = "\n".join(f"{word}:\tdefinition of {word}; {fake_translation(word, 'xx')}" for word in words)
+        else:
+            content = "A concise stand-in definition."
+        if request.get("stream"):
+            self.send_stream(request.get("model", "stub"), content)
+        else:
+            self.send_json(200, {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "stub"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            })
+
+    def send_stream(self, model, content):
+        """Send the content as server-sent events, one line per chunk."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for piece in content.splitlines(keepends=True):
+            chunk = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+    def send_json(self, status, payload, headers=None):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def make_server(host, port, stub):
+    """Create a threaded HTTP server bound to the given stub behaviour."""
+    handler = type("BoundStubHandler", (StubHandler,), {"stub": stub})
+    # A deep listen backlog so connection bursts are not delayed by SYN retransmits
+    server_class = type("StubServer", (ThreadingHTTPServer,), {"request_queue_size": 1024})
+    server = server_class((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def add_stub_arguments(parser):
+    parser.add_argument("--latency", default="lognormal:0.08,0.5",
+                        help="Latency distribution: fixed:S, uniform:MIN,MAX or lognormal:MEDIAN,SIGMA (seconds)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 500")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Requests per second before answering 429 (0 = off)")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After sent with 429 responses (seconds)")
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible runs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the local provider stand-in server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+    stub = ProviderStub(args.latency, args.error_rate, args.rate_limit, args.retry_after, args.seed)
+    server = make_server(args.host, args.port, stub)
+    print(f"Provider stub listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -30,6 +30,9 @@ setup(
         'spacy',  # Required for lemmatization
         'textual',  # Required for the Textual library
     ],
+    extras_require={
+        'fast': ['spacy-lookups-data'],  # Lookup tables for the fast lemmatization mode
+    },
     entry_points={
         'console_scripts': [
             'linguacraft=linguacraft.main:main',  # Entry point for the command line
@@ -1,4 +1,7 @@
+import logging
 import os
+import re
+import threading
 
 def load_known_words(language):
     """
@@ -51,4 +54,175 @@ def save_known_words(known_words, filename):
     """
     with open(filename, "w", encoding="utf-8") as f:
         for word in known_words:
-            f.write(f"{word}\n")
\ No newline at end of file
+            f.write(f"{word}\n")
+
+# Layered vocabularies: shared read-only base lists plus small per-user deltas
+VOCABULARY_DIR = os.getenv("LINGUACRAFT_VOCABULARY_DIR", "vocabularies")
+
+_base_vocabularies = {}  # path -> frozenset, loaded once and shared by all users
+_base_vocabularies_lock = threading.Lock()
+# User ids, language codes and list names become path components: no separators or dots allowed
+_NAME_PATTERN = re.compile(r"[\w-]+")
+
+
+def check_name(value, kind):
+    """
+    Validates a user id, language code or list name used in a vocabulary path.
+    Raises:
+        ValueError: If the value is not made of letters, digits, '_' and '-' only.
+    """
+    if not isinstance(value, str) or not _NAME_PATTERN.fullmatch(value):
+        raise ValueError(f"Invalid {kind} '{value}'.")
+    return value
+
+
+class LayeredVocabulary:
+    """
+    Known words seen through layers: shared base sets plus per-user additions and removals.
+    Membership is checked layer by layer, so the union of the layers is never materialized.
+    All words are stored lowercase.
+    """
+    __slots__ = ("bases", "added", "removed")
+
+    def __init__(self, bases=(), added=None, removed=None):
+        self.bases = tuple(bases)
+        self.added = set(added or ())
+        self.removed = set(removed or ())
+
+    def _in_bases(self, word):
+        return any(word in base for base in self.bases)
+
+    def __contains__(self, word):
+        if word in self.removed:
+            return False
+        return word in self.added or self._in_bases(word)
+
+    def __iter__(self):
+        yield from self.added
+        for index, base in enumerate(self.bases):
+            for word in base:
+                if word in self.removed or word in self.added:
+                    continue
+                if any(word in earlier for earlier in self.bases[:index]):
+                    continue
+                yield word
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def add(self, word):
+        """Marks a word as known in the user's delta."""
+        word = word.lower()
+        self.removed.discard(word)
+        if not self._in_bases(word):
+            self.added.add(word)
+
+    def discard(self, word):
+        """Marks a word as unknown in the user's delta."""
+        word = word.lower()
+        self.added.discard(word)
+        if self._in_bases(word):
+            self.removed.add(word)
+
+
+def load_base_vocabulary(language, level):
+    """
+    Loads a shared, read-only base word list ({VOCABULARY_DIR}/{language}/{level}.txt).
+    Each list is read once per process and the same frozenset is returned to every caller.
+    Args:
+        language (str): The language code of the list.
+        level (str): The list name, e.g. a level such as 'a1'.
+    Returns:
+        frozenset: The lowercase words of the list (empty if the file does not exist).
+    Raises:
+        ValueError: If the language or the level is not a valid name.
+    """
+    path = os.path.join(VOCABULARY_DIR, check_name(language, "language code"), f"{check_name(level, 'level')}.txt")
+    base = _base_vocabularies.get(path)
+    if base is not None:
+        return base
+    with _base_vocabularies_lock:
+        if path not in _base_vocabularies:
+            words = set()
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        word = line.strip().lower()
+                        if word:
+                            words.add(word)
+            else:
+                logging.error(f"Base vocabulary '{path}' not found. Using an empty list.")
+            _base_vocabularies[path] = frozenset(words)
+        return _base_vocabularies[path]
+
+
+def user_delta_file(user, language):
+    """Returns the path of the user's delta file for the given language (ValueError for invalid names)."""
+    check_name(user, "user id")
+    check_name(language, "language code")
+    return os.path.join(VOCABULARY_DIR, "users", user, f"known_words_{language}.delta")
+
+
+def load_user_vocabulary(user, language, levels=()):
+    """
+    Loads the layered vocabulary of a user.
+    The delta file holds one entry per line: '+word' (known) or '-word' (unknown); the last entry wins.
+    Args:
+        user (str): The user id.
+        language (str): The language code.
+        levels (iterable): Names of the shared base lists to layer under the user's delta.
+    Returns:
+        LayeredVocabulary: The user's vocabulary.
+    """
+    vocabulary = LayeredVocabulary(bases=[load_base_vocabulary(language, level) for level in levels])
+    file = user_delta_file(user, language)
+    if os.path.exists(file):
+        with open(file, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith("+"):
+                    vocabulary.add(line[1:])
+                elif line.startswith("-"):
+                    vocabulary.discard(line[1:])
+    return vocabulary
+
+
+def update_user_known_words(user, new_words, language, vocabulary):
+    """
+    Adds new known words to the user's vocabulary and appends them to the user's delta file.
+    Args:
+        user (str): The user id.
+        new_words (list): List of words to add as known.
+        language (str): The language code.
+        vocabulary (LayeredVocabulary): The user's loaded vocabulary.
+    Returns:
+        int: The number of words written (words already known are skipped).
+    """
+    file = user_delta_file(user, language)
+    os.makedirs(os.path.dirname(file), exist_ok=True)
+    added = 0
+    with open(file, "a", encoding="utf-8") as f:
+        for word in new_words:
+            word = word.lower()
+            if word not in vocabulary:
+                vocabulary.add(word)
+                f.write(f"+{word}\n")
+                added += 1
+    return added
+
+
+def save_user_delta(vocabulary, user, language):
+    """
+    Rewrites the user's delta file in compact form (additions and removals only).
+    Args:
+        vocabulary (LayeredVocabulary): The user's vocabulary.
+        user (str): The user id.
+        language (str): The language code.
+    """
+    file = user_delta_file(user, language)
+    os.makedirs(os.path.dirname(file), exist_ok=True)
+    with open(file, "w", encoding="utf-8") as f:
+        for word in vocabulary.added:
+            f.write(f"+{word}\n")
+        for word in vocabulary.removed:
+            f.write(f"-{word}\n")
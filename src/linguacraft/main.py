@@ -1,27 +1,38 @@
 # Import necessary modules from Textual library
 import os
+import sys
 import logging
 from rich.markdown import Markdown
+from rich.markup import escape
 from textual import on, work
 from textual.app import App, ComposeResult
 from textual.containers import Container, Horizontal, Grid, Vertical
+from textual.geometry import Size
+from textual.message import Message
 from textual.reactive import reactive
 from textual.screen import Screen
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
 from textual.widget import Widget
-from textual.widgets import Header, Footer, Input, Button, Static, Label, DataTable, TextArea, Digits, LoadingIndicator
+from rich.segment import Segment
+from textual.widgets import Header, Footer, Input, Button, Static, Label, DataTable, Digits, LoadingIndicator
 from textual.widgets._button import Button
 from textual.widgets._static import Static
+from textual.worker import get_current_worker
 
 # Import custom modules for text processing, known words management, and translation
 from linguacraft.known_words import load_known_words, update_known_words # Manages known words persistence
-from linguacraft.text_processing import detect_language, process_text, read_text_file  # Custom file with text processing functions
+from linguacraft.text_processing import OccurrenceIndex, detect_language  # Custom file with text processing functions
+from linguacraft.sources import SOURCE_ERRORS, detect_source_type, iter_source_chapters, peek_source_sample, process_source  # Reads text, HTML, EPUB and URL sources
 from linguacraft.translation import translate_word  # Manages API calls for translations
-from linguacraft.translation_bulk import fetch_definitions_bulk  # Manages Open API calls for definitions and translations
+from linguacraft.translation_bulk import parse_definition_line, parse_target_languages, save_output_files, stream_definitions_bulk  # Manages Open API calls for definitions and translations
+from linguacraft.word_items import WordItemStore  # Compact storage for the review state of words
 
 # constants
 DEFAULT_INPUT_FILE = "input.txt"
 DEFAULT_LANGUAGE = "uk"
 DEFAULT_OUTPUT_FILE = "output.txt"
+MAX_WORD_COLUMN_WIDTH = 30  # Longer words are cut in the word list
 
 # Configure logging
 logging.basicConfig(
@@ -94,8 +105,8 @@ class InputScreen(Screen):
 
         # Input fields and labels
         yield Container(
-            InputWithLabel("File path:", f"Enter file path here, default value is '{DEFAULT_INPUT_FILE}'", "file_input"),
-            InputWithLabel("Native language code:", f"Default is '{DEFAULT_LANGUAGE}'", "lang_input"),
+            InputWithLabel("File path or URL:", f"Enter a text, HTML or EPUB file path or a URL here, default value is '{DEFAULT_INPUT_FILE}'", "file_input"),
+            InputWithLabel("Native language code(s):", f"Default is '{DEFAULT_LANGUAGE}', separate several with commas (e.g. 'uk,de')", "lang_input"),
             InputWithLabel("Output file path:", f"Enter output file path here, default value is '{DEFAULT_OUTPUT_FILE}'", "output_file_input")
         )
         yield Button("Run Analysis", id="run_analysis_button", variant="primary")
@@ -108,50 +119,34 @@ class InputScreen(Screen):
         if event.button.id == "run_analysis_button":
             await self.app.run_analysis()
 
-class WordItem:
-    """Represents a word with a known/unknown status."""
-    def __init__(self, word):
-        self.word = word
-        self.is_known = False  # Default status is unknown
-        self.translation = "---"  # Translation of the word
-        self.definition = "---"  # Definition of the word
-
-    def toggle_status(self, known=None):
-        """Toggle or set the known/unknown status of the word."""
-        if known is not None:
-            self.is_known = known
-        else:
-            self.is_known = not self.is_known
-
-    def display_status(self):
-        """Return the display label based on the known/unknown status."""
-        return "Known" if self.is_known else "Unknown"
-
 # screen 3: word list
 class WordListScreen(Screen):
     BINDINGS = [
         ("k", "mark_known", "Mark as Known"),
         ("u", "mark_unknown", "Mark as Unknown"),
         ('space', 'get_translation', 'Get Translation'),
+        ("/", "focus_filter", "Filter Words"),
         ("h", "go_home", "Go Home"),
         ("s", "start_over", "Start Over (Go to Input Screen)"),
     ]
 
-    def __init__(self, word_items, translation_language, detected_language):
+    def __init__(self, word_items, translation_language, detected_language, occurrence_index=None):
         super().__init__()
-        # Initialize WordItem instances and DataTable
-        # self.word_items_edit = [WordItem(word.word) for word in word_items]
+        # WordItemStore of the words to review
         self.word_items_edit = word_items
         self.translation_language = translation_language
         self.detected_language = detected_language
+        self.occurrence_index = occurrence_index  # Where the words occur in the text, for showing context
 
     def compose(self) -> ComposeResult:
         yield Header()
         yield Label(f"Detected Language: {self.detected_language}")
         yield Container(
             Label("Unknown Words for Classification:"),
-            DataTable(id="word_table")
+            Input(placeholder="Filter words (press / to search, Enter to return to the list)", id="word_filter"),
+            WordTable(self.word_items_edit, id="word_table")
         )
+        yield Static("Context: ---", id="context_text", classes="context")
         # Add the instruction text as a Static widget
         yield Static(
             "Instruction: Please press 'Complete' button when you finish reviewing the words and mark as 'Known' all words you know the translation and definition.",
@@ -162,19 +157,37 @@ class WordListScreen(Screen):
         yield Footer()
 
     def on_mount(self) -> None:
-        """Set up the DataTable when the screen is mounted."""
+        """Focus the word table and prepare the filter when the screen is mounted."""
         self.app.sub_title = "check the words"
-
-        table = self.query_one(DataTable)
-        table.zebra_stripes = True
-        table.cursor_type = "row"
-        # Add columns with header names only (without tuple)
-        table.add_columns("ID", "Word", "Status", "Translation")
-
-        # Add rows with explicit row keys based on index
-        for index, item in enumerate(self.word_items_edit):
-            row_data = (index, item.word, item.display_status(), item.translation)
-            table.add_row(*row_data) # Use index as row key
+        self.query_one(WordTable).focus()
+        # Build the prefix index now, so the first keystroke in the filter is as fast as the others
+        self.word_items_edit.build_search_index()
+
+    @on(Input.Changed, "#word_filter")
+    def filter_words(self, event: Input.Changed) -> None:
+        """Show only the words starting with the filter text."""
+        # The table renders only its visible rows, so swapping the shown indexes is all a keystroke costs
+        self.query_one(WordTable).show(self.word_items_edit.search(event.value))
+
+    @on(Input.Submitted, "#word_filter")
+    def return_to_table(self) -> None:
+        self.query_one(WordTable).focus()
+
+    def action_focus_filter(self) -> None:
+        """Move the focus to the filter input."""
+        self.query_one("#word_filter", Input).focus()
+
+    def on_word_table_row_highlighted(self, event: "WordTable.RowHighlighted") -> None:
+        """Show the sentence in which the highlighted word first occurs."""
+        if self.occurrence_index is None:
+            return
+        word = self.word_items_edit[event.index].word if event.index is not None else None
+        context = self.occurrence_index.context(word) if word else None
+        if context:
+            count = self.occurrence_index.count(word)
+            self.query_one("#context_text", Static).update(f"Context ({count}x): {escape(context)}")
+        else:
+            self.query_one("#context_text", Static).update("Context: ---")
 
     def action_mark_known(self) -> None:
         """Mark the selected word as known."""
@@ -186,22 +199,20 @@ class WordListScreen(Screen):
 
     def action_get_translation(self) -> None:
         """Translate the selected word and update the translation column."""
-        table = self.query_one(DataTable)
+        table = self.query_one(WordTable)
         
-        # Get the current cursor row index
-        cursor_row = table.cursor_coordinate[0]  # Row index
-        word_item = self.word_items_edit[cursor_row]  # Access WordItem directly by row index
+        # The WordItem under the cursor (the table may be filtered)
+        word_item = table.cursor_item()
+        if word_item is None:
+            return
 
         # Fetch the translation for the selected word
-        translation = translate_word(word_item.word, self.translation_language)
+        # With several target languages, quick translations use the first one
+        translation = translate_word(word_item.word, parse_target_languages(self.translation_language)[0])
         word_item.translation = translation  # Update the WordItem with the translation
 
-        # Move cursor to the "Translation" column to get correct cell keys
-        table.move_cursor(column=3)  # Column 3 is "Translation"
-        row_key, col_key = table.coordinate_to_cell_key(table.cursor_coordinate)
-
-        # Update the "Translation" cell with the translated word
-        table.update_cell(row_key, col_key, word_item.translation, update_width=True)
+        # Redraw the visible rows with the new translation
+        table.refresh()
 
     async def on_button_pressed(self, event):
         if event.button.id == "complete_button":
@@ -209,19 +220,16 @@ class WordListScreen(Screen):
 
     def _toggle_word_status(self, known: bool) -> None:
         """Toggle the known/unknown status of the currently selected word."""
-        table = self.query_one(DataTable)
+        table = self.query_one(WordTable)
 
-        # Get the current row index from the cursor
-        cursor_row = table.cursor_coordinate[0]  # Row index
-        word_item = self.word_items_edit[cursor_row]  # Access WordItem directly by row index
+        # The WordItem under the cursor (the table may be filtered)
+        word_item = table.cursor_item()
+        if word_item is None:
+            return
         word_item.toggle_status(known=known)
 
-        # Move cursor to the "Status" column to get correct cell keys
-        table.move_cursor(column=2)  # Column 2 is "Status"
-        row_key, col_key = table.coordinate_to_cell_key(table.cursor_coordinate)
-        
-        # Update the "Status" cell with the new status label
-        table.update_cell(row_key, col_key, word_item.display_status())
+        # Redraw the visible rows with the new status label
+        table.refresh()
 
     async def action_go_home(self):
         """Return to the home screen."""
@@ -255,8 +263,8 @@ class ResultScreen(Screen):
     def compose(self) -> ComposeResult:
         yield Header()
         yield LoadingIndicator(id="loader")
-        yield Label("fsdfdsfdsfsd", id="result_label")
-        yield TextArea(id="output_textarea", read_only=True)
+        yield Label(f"Generating definitions and translations ({self.output_file})...", id="result_label")
+        yield DataTable(id="results_table")
         yield Horizontal(
             Label(id="new_known_label"),
             Digits(id="new_known_digits"),
@@ -269,27 +277,47 @@ class ResultScreen(Screen):
         yield Footer()
 
     async def on_mount(self) -> None:
-        self.call_later(self.fetch_results)
-
-    async def fetch_results(self):
-        """Run the obtaining of definition and translation of unknown words. Shows the results."""
-        await self.app.finalize_and_translate()
-
-        # Read the output file content asynchronously
-        try:
-            # Use a thread-safe approach to read the file asynchronously
-            with open(self.output_file, "r", encoding="utf-8") as file:
-                self.output_content = file.read()
-        except FileNotFoundError:
-            self.output_content = "Output file not found."
-
-        # Remove the LoadingIndicator
-        loader = self.query_one("#loader", LoadingIndicator)
-        loader.remove()
+        table = self.query_one("#results_table", DataTable)
+        table.zebra_stripes = True
+        table.cursor_type = "row"
+        self.target_languages = parse_target_languages(self.app.translation_language)
+        if len(self.target_languages) == 1:
+            table.add_columns("Word", "Definition", "Translation")
+        else:
+            table.add_columns("Word", "Definition", *(f"Translation ({target})" for target in self.target_languages))
+        self.fetch_results()
+
+    @work(thread=True, exclusive=True)
+    def fetch_results(self):
+        """Stream the definitions and translations of unknown words into the results table as they are generated."""
+        worker = get_current_worker()
+        lines = []
+        for line in self.app.stream_definitions():
+            if worker.is_cancelled:
+                return
+            lines.append(line)
+            self.app.call_from_thread(self.add_result_line, line)
+        self.app.call_from_thread(self.complete_results, "\n".join(lines))
+
+    def add_result_line(self, line):
+        """Show one line of the LLM response as a row of the results table."""
+        if self.query("#loader"):
+            self.query_one("#loader", LoadingIndicator).remove()
+        parsed = parse_definition_line(line, len(self.target_languages))
+        if parsed is None:
+            parsed = (line, "", *[""] * len(self.target_languages))  # Keep lines that do not match the format visible
+        self.query_one("#results_table", DataTable).add_row(*parsed)
+
+    async def complete_results(self, output_content):
+        """Save the results and show the summary once the whole response has been received."""
+        self.output_content = output_content
+        output_files = await self.app.finalize_and_translate(output_content)
+
+        if self.query("#loader"):
+            self.query_one("#loader", LoadingIndicator).remove()
 
         # Update the screen
-        self.query_one("#result_label", Label).update("Results")
-        self.query_one("#output_textarea", TextArea).text = f"{self.output_file}\n------\n{self.output_content}"
+        self.query_one("#result_label", Label).update(f"Results (saved to {', '.join(output_files)})")
         self.query_one("#new_known_label", Label).update("New Known Words:")
         self.query_one("#new_known_digits", Digits).update(str(self.new_known_words_count))
         self.query_one("#total_known_label", Label).update("Total Known Words:")
@@ -324,6 +352,130 @@ class InputWithLabel(Widget):
         yield Label(self.input_label)
         yield Input(placeholder=self.input_placeholder, id=self.input_id)
 
+class WordTable(ScrollView, can_focus=True):
+    """
+    Virtualized table of the words of a WordItemStore (ID, Word, Status, Translation).
+    Only the visible lines are rendered, from the list of store indexes currently shown, so showing
+    or filtering tens of thousands of words costs the same as drawing one screen.
+    """
+
+    DEFAULT_CSS = """
+    WordTable {
+        height: 1fr;
+    }
+    WordTable > .word-table--header {
+        text-style: bold;
+    }
+    WordTable > .word-table--even-row {
+        background: $boost;
+    }
+    WordTable > .word-table--cursor {
+        background: $accent;
+    }
+    """
+    COMPONENT_CLASSES = {"word-table--header", "word-table--even-row", "word-table--cursor"}
+    BINDINGS = [
+        ("up", "cursor_up", "Cursor Up"),
+        ("down", "cursor_down", "Cursor Down"),
+        ("pageup", "page_up", "Page Up"),
+        ("pagedown", "page_down", "Page Down"),
+        ("home", "first_row", "First Row"),
+        ("end", "last_row", "Last Row"),
+    ]
+
+    cursor_row = reactive(0)
+
+    class RowHighlighted(Message):
+        """Posted when the cursor moves to another word. `index` is its store index (None if the table is empty)."""
+
+        def __init__(self, index):
+            super().__init__()
+            self.index = index
+
+    def __init__(self, word_items, **kwargs):
+        super().__init__(**kwargs)
+        self.word_items = word_items
+        self.rows = range(len(word_items))  # Store indexes of the shown words, in display order
+        self.id_width = max(2, len(str(len(word_items))))
+        self.word_width = min(MAX_WORD_COLUMN_WIDTH, max((len(word) for word in word_items.words), default=4))
+
+    def on_mount(self) -> None:
+        self.show(self.rows)
+
+    def show(self, rows) -> None:
+        """Show the words at the given store indexes."""
+        self.rows = rows
+        self.virtual_size = Size(0, len(rows) + 1)  # One line for the header; rows are cut to the width
+        self.cursor_row = 0
+        self.scroll_to(y=0, animate=False)
+        self.refresh()
+        self.post_message(self.RowHighlighted(self.rows[0] if self.rows else None))
+
+    def cursor_item(self):
+        """Return the WordItem under the cursor, or None if the table is empty."""
+        if not self.rows:
+            return None
+        return self.word_items[self.rows[self.cursor_row]]
+
+    def format_row(self, cells) -> str:
+        (index, word, status, translation) = cells
+        return f" {index:>{self.id_width}}  {word[:self.word_width]:<{self.word_width}}  {status:<7}  {translation}"
+
+    def render_line(self, y: int) -> Strip:
+        width = self.size.width
+        if y == 0:
+            text = self.format_row(("ID", "Word", "Status", "Translation"))
+            style = self.get_component_rich_style("word-table--header")
+        else:
+            row = int(self.scroll_offset.y) + y - 1
+            if row >= len(self.rows):
+                return Strip.blank(width, self.rich_style)
+            item = self.word_items[self.rows[row]]
+            text = self.format_row((item.index, item.word, item.display_status(), item.translation))
+            if row == self.cursor_row:
+                style = self.get_component_rich_style("word-table--cursor")
+            elif row % 2:
+                style = self.get_component_rich_style("word-table--even-row")
+            else:
+                style = self.rich_style
+        return Strip([Segment(text[:width].ljust(width), style)])
+
+    def watch_cursor_row(self, old_row: int, row: int) -> None:
+        # Keep the cursor in view: rows start below the header line
+        visible_rows = max(1, self.size.height - 1)
+        if row < self.scroll_offset.y:
+            self.scroll_to(y=row, animate=False)
+        elif row >= self.scroll_offset.y + visible_rows:
+            self.scroll_to(y=row - visible_rows + 1, animate=False)
+        self.refresh()
+        if old_row != row and self.rows:
+            self.post_message(self.RowHighlighted(self.rows[row]))
+
+    def move_cursor(self, row: int) -> None:
+        self.cursor_row = max(0, min(row, len(self.rows) - 1))
+
+    def action_cursor_up(self) -> None:
+        self.move_cursor(self.cursor_row - 1)
+
+    def action_cursor_down(self) -> None:
+        self.move_cursor(self.cursor_row + 1)
+
+    def action_page_up(self) -> None:
+        self.move_cursor(self.cursor_row - max(1, self.size.height - 1))
+
+    def action_page_down(self) -> None:
+        self.move_cursor(self.cursor_row + max(1, self.size.height - 1))
+
+    def action_first_row(self) -> None:
+        self.move_cursor(0)
+
+    def action_last_row(self) -> None:
+        self.move_cursor(len(self.rows) - 1)
+
+    def on_click(self, event) -> None:
+        if event.y > 0:
+            self.move_cursor(int(self.scroll_offset.y) + event.y - 1)
+
 class QuestionScreen(Screen[bool]):
     """Screen with a parameter."""
 
@@ -351,15 +503,16 @@ class LinguaLearnApp(App):
     SUB_TITLE = "knows what you don't know"
 
     # User Input
-    # TODO: add reactive property for source type: file or url
     selected_file = reactive("")
+    source_type = reactive("text") # Type of the input source: text, html, epub or url
     translation_language = reactive("")
     output_file = reactive("")
 
     # Calculated properties
-    word_items = reactive([]) # All potential unknown words to be processed (loaded from text file or URL)
+    word_items = reactive(WordItemStore) # All potential unknown words to be processed (loaded from text file or URL)
     known_words = reactive([]) # ALready known words (loaded from file)
     unknown_words = reactive([]) # Words to be translated and defined
+    occurrence_index = None # Offsets and context sentences of the words in the text
     
     async def on_mount(self):
         await self.push_screen(WelcomeScreen())  # Start with WelcomeScreen
@@ -372,31 +525,52 @@ class LinguaLearnApp(App):
         file_output = self.query_one("#output_file_input", Input)
         self.selected_file = file_input.value.strip() or DEFAULT_INPUT_FILE
         self.detected_language = ""
-        self.translation_language = lang_input.value.strip() or DEFAULT_LANGUAGE
+        self.translation_language = ",".join(parse_target_languages(lang_input.value)) or DEFAULT_LANGUAGE
         self.output_file = file_output.value.strip() or DEFAULT_OUTPUT_FILE
 
-        # Detect language
-        # read the text from the file self.selected_file
-        input_text = read_text_file(self.selected_file)
-        self.detected_language = detect_language(input_text)
+        self.source_type = detect_source_type(self.selected_file)
+        if self.source_type != "url" and not os.path.isfile(self.selected_file):
+            self.notify("Please enter a valid file path or URL.", severity="error")
+            return
+
+        # Detect language from the beginning of the source; the chapters read for it are analyzed too,
+        # so the source (e.g. a URL) is only read once
+        source_chapters = iter_source_chapters(self.selected_file, self.source_type)
+        try:
+            (input_sample, chapters) = peek_source_sample(source_chapters)
+        except SOURCE_ERRORS as e:
+            logging.error(f"Error reading source '{self.selected_file}': {e}")
+            input_sample = ""
+        if not input_sample:
+            source_chapters.close()
+            self.notify("Could not read any text from the source.", severity="error")
+            return
+        self.detected_language = detect_language(input_sample)
 
         # Load known words based on detected language
         (self.known_words, _) = load_known_words(self.detected_language)
-        if not self.selected_file or not os.path.isfile(self.selected_file):
-            self.notify("Please enter a valid file path.", severity="error")
-            return
 
-        unknown_words_estimated = process_text(self.selected_file, self.known_words, self.detected_language)
-        # Generate WordItem objects for each unknown word
-        self.word_items = [WordItem(word) for word in unknown_words_estimated]
+        # Stream the source chapter by chapter into the text processing pipeline
+        try:
+            self.occurrence_index = OccurrenceIndex()
+            unknown_words_estimated = process_source(self.selected_file, self.known_words, self.detected_language, self.source_type,
+                                                     index=self.occurrence_index, chapters=chapters)
+        except Exception as e:
+            logging.error(f"Error processing source '{self.selected_file}': {e}")
+            self.notify(f"Error processing source: {e}", severity="error")
+            return
+        finally:
+            source_chapters.close()
+        # Store the review state of each unknown word
+        self.word_items = WordItemStore(unknown_words_estimated)
 
         # Transition to WordListScreen
-        await self.push_screen(WordListScreen(self.word_items, self.translation_language, self.detected_language))
+        await self.push_screen(WordListScreen(self.word_items, self.translation_language, self.detected_language, self.occurrence_index))
     
     async def run_processing(self):
         """Run the obtaining of definition and translation of unknown words."""
 
-        known_words_new = [item.word for item in self.word_items if item.is_known]
+        known_words_new = self.word_items.known_words()
         known_words_new_count = len(known_words_new)
         if known_words_new_count > 0:
             update_known_words(known_words_new, self.detected_language)
@@ -404,7 +578,7 @@ class LinguaLearnApp(App):
 
         total_known_words_count = len(self.known_words) + known_words_new_count
 
-        self.unknown_words = [item.word for item in self.word_items if not item.is_known]
+        self.unknown_words = self.word_items.unknown_words()
         unknown_words_count = len(self.unknown_words)
 
         if unknown_words_count == 0:
@@ -414,20 +588,30 @@ class LinguaLearnApp(App):
         # Transition to ResultScreen
         self.push_screen(ResultScreen(self.output_file, known_words_new_count, total_known_words_count, unknown_words_count))
 
-    async def finalize_and_translate(self):
-        """Finalize word classification and proceed with translation."""
-        # Fetch translations and definitions for unknown words
-        fetch_definitions_bulk(self.unknown_words, self.detected_language, self.translation_language)
+    def stream_definitions(self):
+        """Stream definitions and translations for unknown words, one response line at a time."""
+        contexts = self.occurrence_index.contexts_for(self.unknown_words) if self.occurrence_index else None
+        return stream_definitions_bulk(self.unknown_words, self.detected_language, self.translation_language, contexts)
+
+    async def finalize_and_translate(self, definitions):
+        """Save the definitions and translations (one file per target language) and finalize word classification."""
+        output_files = save_output_files(definitions, self.output_file, self.translation_language)
 
         # Add unknown words to the known words list
         update_known_words(self.unknown_words, self.detected_language)
         self.notify("All unknown words added to known words list.", severity="information")
 
         # Display completion message
-        self.notify("Analysis complete! Check output.txt for results.")
+        self.notify(f"Analysis complete! Check {', '.join(output_files)} for results.")
+        return output_files
 
 def main():
     """Main entry point for LinguaCraft."""
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        # Headless mode: long-running local analysis server
+        from linguacraft.server import main as serve_main
+        serve_main(sys.argv[2:])
+        return
     LinguaLearnApp().run()
 
 """Main entry point."""
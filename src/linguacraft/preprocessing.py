@@ -0,0 +1,179 @@
+import hashlib
+import logging
+import re
+
+# constants
+DEFAULT_SIMILARITY_THRESHOLD = 0.9  # Blocks at least this similar to an earlier block are dropped
+BOILERPLATE_MAX_CHARS = 80  # Only short lines (headers, footers, page numbers) count as boilerplate
+MIN_NEAR_DUPLICATE_WORDS = 8  # Blocks with fewer real words (no numbers) are only compared exactly
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 4  # Near-duplicate candidates must match exactly in at least one 16-bit band
+
+_WORD_PATTERN = re.compile(r"\w+")
+_DIGITS_PATTERN = re.compile(r"\d+")
+_PARAGRAPH_PATTERN = re.compile(r"(\n\s*\n)")
+
+
+def normalize_block(text):
+    """Normalizes a block for comparison: lowercase, digits masked, whitespace collapsed."""
+    return " ".join(_DIGITS_PATTERN.sub("0", text.lower()).split())
+
+
+def block_hash(normalized):
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).digest()
+
+
+# Maps the ASCII digits of a binary string to 0/1 bytes, so bit counts can be summed lane by lane
+_BIT_LANES = bytes.maketrans(b"01", b"\x00\x01")
+
+
+def simhash(words):
+    """64-bit SimHash of the word 3-shingles of a block."""
+    shingles = [" ".join(words[i:i + 3]) for i in range(max(1, len(words) - 2))]
+    counts = [0] * SIMHASH_BITS
+    lanes = 0  # One byte per bit position; flushed before a byte can overflow
+    for number, shingle in enumerate(shingles, 1):
+        value = hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest()
+        lanes += int.from_bytes(format(int.from_bytes(value, "big"), "064b").encode("ascii").translate(_BIT_LANES), "big")
+        if number % 255 == 0 or number == len(shingles):
+            for bit, count in enumerate(lanes.to_bytes(SIMHASH_BITS, "big")):
+                counts[bit] += count
+            lanes = 0
+    return int("".join("1" if 2 * count > len(shingles) else "0" for count in counts), 2)
+
+
+def line_key(line):
+    return block_hash(normalize_block(line))
+
+
+def is_short_line(line):
+    return bool(line) and len(line) <= BOILERPLATE_MAX_CHARS
+
+
+class DuplicateFilter:
+    """
+    Single-pass filter that drops exact and near-duplicate paragraphs and recurring short lines.
+
+    Exact duplicates are found by hashing normalized blocks. Near duplicates are found with
+    SimHash fingerprints bucketed by band (locality-sensitive hashing), so each block is only
+    compared with a few candidates. Fingerprints cover only the real words of a block: numbers,
+    timestamps and repeated short lines are left out, so e.g. subtitle cues that differ only in
+    their dialogue are not taken for near duplicates. Repeated short lines (page headers and footers,
+    page numbers, repeated subtitle lines) are kept the first time they are seen and dropped afterwards.
+    The filter keeps state between calls, so a long text can be filtered chunk by chunk with the same
+    result as filtering it at once. Time and memory are linear in the size of the text.
+    """
+
+    def __init__(self, similarity_threshold=DEFAULT_SIMILARITY_THRESHOLD):
+        self.similarity_threshold = similarity_threshold
+        self.max_distance = int((1 - similarity_threshold) * SIMHASH_BITS)
+        self.seen_blocks = set()
+        self.seen_lines = set()
+        self.bands = [{} for _ in range(SIMHASH_BANDS)]  # band value -> fingerprints
+        self.report = {
+            "input_chars": 0,
+            "removed_chars": 0,
+            "duplicate_blocks": 0,
+            "near_duplicate_blocks": 0,
+            "boilerplate_lines": 0,
+        }
+
+    def is_near_duplicate(self, fingerprint):
+        band_bits = SIMHASH_BITS // SIMHASH_BANDS
+        mask = (1 << band_bits) - 1
+        keys = [fingerprint >> (band * band_bits) & mask for band in range(SIMHASH_BANDS)]
+        for band, key in enumerate(keys):
+            for candidate in self.bands[band].get(key, ()):
+                if bin(candidate ^ fingerprint).count("1") <= self.max_distance:
+                    return True
+        for band, key in enumerate(keys):
+            self.bands[band].setdefault(key, []).append(fingerprint)
+        return False
+
+    def filter_lines(self, block):
+        """Drops short lines seen before from a block (the first occurrence is kept)."""
+        kept = []
+        for line in block.split("\n"):
+            stripped = line.strip()
+            if is_short_line(stripped):
+                key = line_key(stripped)
+                if key in self.seen_lines:
+                    self.report["boilerplate_lines"] += 1
+                    continue
+                self.seen_lines.add(key)
+            kept.append(line)
+        return "\n".join(kept)
+
+    def content_words(self, block):
+        """The words a block adds: without numbers, timestamps and short lines seen before."""
+        words = []
+        for line in block.split("\n"):
+            stripped = line.strip()
+            if is_short_line(stripped) and line_key(stripped) in self.seen_lines:
+                continue
+            words.extend(word for word in _WORD_PATTERN.findall(stripped.lower()) if not _DIGITS_PATTERN.search(word))
+        return words
+
+    def filter_block(self, block):
+        """Returns the block, or an empty string if it duplicates earlier text."""
+        normalized = normalize_block(block)
+        if not normalized:
+            return block
+        key = block_hash(normalized)
+        if key in self.seen_blocks:
+            self.report["duplicate_blocks"] += 1
+            return ""
+        self.seen_blocks.add(key)
+
+        words = self.content_words(block)
+        if len(words) >= MIN_NEAR_DUPLICATE_WORDS and self.max_distance > 0:
+            if self.is_near_duplicate(simhash(words)):
+                self.report["near_duplicate_blocks"] += 1
+                return ""
+        return self.filter_lines(block)
+
+    def filter(self, text):
+        """
+        Filters a text (or the next chunk of a text).
+        Args:
+            text (str): The text to clean.
+        Returns:
+            str: The text without duplicate blocks and recurring boilerplate lines.
+        """
+        parts = _PARAGRAPH_PATTERN.split(text)
+        # parts alternates block, separator, block, ...
+        cleaned = []
+        for position, part in enumerate(parts):
+            cleaned.append(part if position % 2 else self.filter_block(part))
+        result = "".join(cleaned)
+        self.report["input_chars"] += len(text)
+        self.report["removed_chars"] += len(text) - len(result)
+        return result
+
+
+def strip_boilerplate(text, similarity_threshold=DEFAULT_SIMILARITY_THRESHOLD):
+    """
+    Removes exact and near-duplicate paragraphs and repeated boilerplate lines from a text.
+    Repeated short lines are removed after their first occurrence, as when a source is filtered
+    chapter by chapter in process_source.
+    Args:
+        text (str): The input text.
+        similarity_threshold (float): Paragraphs at least this similar (0..1) to an earlier one are dropped;
+            1.0 drops exact duplicates only.
+    Returns:
+        tuple: The cleaned text and a report dict with the removed characters, blocks and lines.
+    """
+    duplicate_filter = DuplicateFilter(similarity_threshold)
+    cleaned = duplicate_filter.filter(text)
+    log_report(duplicate_filter.report)
+    return (cleaned, duplicate_filter.report)
+
+
+def log_report(report):
+    """Logs how much text the preprocessing removed."""
+    share = report["removed_chars"] / report["input_chars"] if report["input_chars"] else 0
+    logging.info(
+        f"Preprocessing removed {report['removed_chars']} of {report['input_chars']} characters ({share:.1%}): "
+        f"{report['duplicate_blocks']} duplicate blocks, {report['near_duplicate_blocks']} near-duplicate blocks, "
+        f"{report['boilerplate_lines']} boilerplate lines."
+    )
@@ -0,0 +1,391 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+from linguacraft.known_words import check_name, load_known_words, load_user_vocabulary, update_user_known_words, user_delta_file
+from linguacraft.text_processing import (SPACY_MODELS, analyze_text, analyze_text_by_language, detect_language,
+                                         ensure_spacy_model, load_pipelines)
+from linguacraft.translation import translate_word
+
+# constants
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+DEFAULT_QUEUE_SIZE = 64  # Requests allowed to wait for a worker before the server answers 503
+DEFAULT_TRANSLATION_CACHE_SIZE = 100_000
+MAX_BODY_SIZE = 10 * 1024 * 1024  # 10 MB
+MAX_HEADER_LINES = 100
+
+
+class KnownWordsCache:
+    """Keeps the known words of every language in memory, reloading a file only when it changes on disk."""
+
+    def __init__(self):
+        self._entries = {}  # language -> (mtime, known_words)
+        self._lock = threading.Lock()
+
+    def get(self, language):
+        """
+        Returns the known words for the given language.
+        Args:
+            language (str): The language code for the known words file.
+        Returns:
+            set: The set of known words (shared, must not be modified by the caller).
+        """
+        file = f"known_words_{language}.txt"
+        try:
+            mtime = os.path.getmtime(file)
+        except OSError:
+            mtime = None
+        with self._lock:
+            entry = self._entries.get(language)
+            if entry is None or entry[0] != mtime:
+                (known_words, _) = load_known_words(language)
+                entry = (mtime, known_words)
+                self._entries[language] = entry
+            return entry[1]
+
+    def get_user(self, user, language, levels=()):
+        """
+        Returns the layered vocabulary of a user. Base lists are shared by all users,
+        so only the user's delta is held per user.
+        Args:
+            user (str): The user id.
+            language (str): The language code.
+            levels (tuple): Names of the shared base lists.
+        Returns:
+            LayeredVocabulary: The user's vocabulary.
+        """
+        file = user_delta_file(user, language)
+        try:
+            mtime = os.path.getmtime(file)
+        except OSError:
+            mtime = None
+        key = (user, language, tuple(levels))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != mtime:
+                entry = (mtime, load_user_vocabulary(user, language, levels))
+                self._entries[key] = entry
+            return entry[1]
+
+    def add_user_words(self, user, language, levels, words):
+        """Adds known words to a user's vocabulary and delta file. Returns the number of words written."""
+        vocabulary = self.get_user(user, language, levels)
+        with self._lock:
+            added = update_user_known_words(user, words, language, vocabulary)
+            # The delta file now matches the cached vocabulary
+            self._entries[(user, language, tuple(levels))] = (os.path.getmtime(user_delta_file(user, language)), vocabulary)
+        return added
+
+
+class TranslationCache:
+    """Thread-safe LRU cache for word translations shared by all requests."""
+
+    def __init__(self, max_size=DEFAULT_TRANSLATION_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class HTTPError(Exception):
+    """Raised by request handlers to answer with an error status."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class AnalysisServer:
+    """
+    Local asyncio HTTP service exposing text analysis and translation.
+
+    Requests are executed on a bounded worker pool. When all workers are busy and
+    the waiting queue is full, new requests are rejected with 503 instead of piling up.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, workers=DEFAULT_WORKERS,
+                 queue_size=DEFAULT_QUEUE_SIZE, preload_languages=()):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.queue_size = queue_size
+        self.preload_languages = preload_languages
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="linguacraft-worker")
+        self.known_words_cache = KnownWordsCache()
+        self.translation_cache = TranslationCache()
+        self.in_flight = 0
+        self.rejected = 0
+        self.routes = {
+            ("GET", "/health"): self.handle_health,
+            ("POST", "/analyze"): self.handle_analyze,
+            ("POST", "/translate"): self.handle_translate,
+            ("POST", "/known-words"): self.handle_known_words,
+        }
+
+    async def serve_forever(self):
+        """Load the requested models and serve until cancelled."""
+        loop = asyncio.get_running_loop()
+        for language in self.preload_languages:
+            logging.info(f"Preloading SpaCy model for '{language}'...")
+            await loop.run_in_executor(self.executor, ensure_spacy_model, language)
+
+        server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        logging.info(f"LinguaCraft server listening on http://{self.host}:{self.port} with {self.workers} workers")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def run_in_worker(self, func, *args):
+        """Run a blocking function on the worker pool, rejecting the request when the pool is saturated."""
+        if self.in_flight >= self.workers + self.queue_size:
+            self.rejected += 1
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "Server is busy, retry later.")
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            self.in_flight -= 1
+
+    async def handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests on a single connection (keep-alive supported)."""
+        try:
+            while True:
+                request = await self.read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                status, payload = await self.dispatch(method, path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                self.write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except HTTPError as e:
+            self.write_response(writer, e.status, {"error": e.message}, keep_alive=False)
+            await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def read_request(self, reader):
+        """Read one HTTP request. Returns None when the client closed the connection."""
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+        try:
+            method, path, _ = request_line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line.")
+
+        headers = {}
+        for _ in range(MAX_HEADER_LINES):
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        else:
+            raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Too many headers.")
+
+        try:
+            length = int(headers.get("content-length", 0) or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length header.")
+        if length > MAX_BODY_SIZE:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body is too large.")
+        body = await reader.readexactly(length) if length else b""
+        return (method.upper(), path.split("?", 1)[0], headers, body)
+
+    async def dispatch(self, method, path, body):
+        """Route a request to its handler and convert errors into JSON responses."""
+        handler = self.routes.get((method, path))
+        if handler is None:
+            return (HTTPStatus.NOT_FOUND, {"error": f"No route for {method} {path}"})
+        try:
+            data = json.loads(body) if body else {}
+            if not isinstance(data, dict):
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "Request body must be a JSON object.")
+            return (HTTPStatus.OK, await handler(data))
+        except HTTPError as e:
+            return (e.status, {"error": e.message})
+        except json.JSONDecodeError as e:
+            return (HTTPStatus.BAD_REQUEST, {"error": f"Invalid JSON: {e}"})
+        except ValueError as e:
+            return (HTTPStatus.BAD_REQUEST, {"error": str(e)})
+        except Exception as e:
+            logging.error(f"Error handling {method} {path}: {e}")
+            return (HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)})
+
+    def write_response(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = [
+            f"HTTP/1.1 {status.value} {status.phrase}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if status == HTTPStatus.SERVICE_UNAVAILABLE:
+            head.append("Retry-After: 1")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+
+    async def handle_health(self, data):
+        return {
+            "status": "ok",
+            "in_flight": self.in_flight,
+            "rejected": self.rejected,
+            "translation_cache_size": len(self.translation_cache),
+        }
+
+    async def handle_analyze(self, data):
+        """
+        Analyze a text and return its unknown words.
+        Request: {"text": str, "language": optional str, "user": optional str, "levels": optional [str],
+                  "mixed": optional bool, "fast": optional bool}
+        With a user, known words come from the shared base lists named in 'levels' plus the user's delta.
+        With 'mixed', paragraphs are routed by language and the unknown words are keyed by language.
+        With 'fast', lemmas come from lookup tables instead of the full SpaCy pipeline.
+        """
+        text = data.get("text")
+        if not isinstance(text, str) or not text.strip():
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Field 'text' must be a non-empty string.")
+        fast = bool(data.get("fast"))
+        if data.get("mixed"):
+            return await self.run_in_worker(self.analyze_mixed, text, data.get("user"), self.parse_levels(data), fast)
+        language = data.get("language")
+        if language:
+            self.check_language(language)
+        return await self.run_in_worker(self.analyze, text, language, data.get("user"), self.parse_levels(data), fast)
+
+    def known_words_for(self, language, user=None, levels=()):
+        if user:
+            return self.known_words_cache.get_user(user, language, levels)
+        return self.known_words_cache.get(language)
+
+    def check_language(self, language):
+        if language not in SPACY_MODELS:
+            raise HTTPError(HTTPStatus.UNPROCESSABLE_ENTITY, f"Language '{language}' is not supported.")
+
+    def analyze(self, text, language=None, user=None, levels=(), fast=False):
+        language = language or detect_language(text)
+        if not language:
+            raise HTTPError(HTTPStatus.UNPROCESSABLE_ENTITY, "Could not detect the language of the text.")
+        self.check_language(language)
+        try:
+            # Never download models from a request: a missing model is an error response
+            load_pipelines(language, fast=fast, download_missing=False)
+        except OSError as e:
+            logging.error(str(e))
+            raise HTTPError(HTTPStatus.INTERNAL_SERVER_ERROR, f"The model for language '{language}' is not available.")
+        unknown_words = analyze_text(text, self.known_words_for(language, user, levels), language, fast=fast)
+        return {"language": language, "unknown_words": unknown_words}
+
+    def analyze_mixed(self, text, user=None, levels=(), fast=False):
+        # Already on a pool worker: analyze the language groups one after another, so a request
+        # never uses more than the one thread counted in in_flight
+        unknown_words = analyze_text_by_language(text, lambda language: self.known_words_for(language, user, levels),
+                                                 max_workers=1, fast=fast, download_missing=False)
+        return {"languages": unknown_words}
+
+    async def handle_translate(self, data):
+        """
+        Translate a list of words.
+        Request: {"words": [str], "target_language": str, "provider": optional str}
+        """
+        words = data.get("words")
+        target_language = data.get("target_language")
+        if not isinstance(words, list) or not all(isinstance(word, str) for word in words):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Field 'words' must be a list of strings.")
+        if not isinstance(target_language, str) or not target_language:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Field 'target_language' is required.")
+        provider = data.get("provider", "deep-google")
+        return await self.run_in_worker(self.translate, words, target_language, provider)
+
+    async def handle_known_words(self, data):
+        """
+        Add known words to a user's vocabulary.
+        Request: {"user": str, "language": str, "words": [str], "levels": optional [str]}
+        """
+        words = data.get("words")
+        if not isinstance(words, list) or not all(isinstance(word, str) for word in words):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Field 'words' must be a list of strings.")
+        user = data.get("user")
+        language = data.get("language")
+        if not isinstance(user, str) or not isinstance(language, str) or not language:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Fields 'user' and 'language' are required.")
+        check_name(user, "user id")
+        check_name(language, "language code")
+        levels = self.parse_levels(data)
+        added = await self.run_in_worker(self.known_words_cache.add_user_words, user, language, levels, words)
+        return {"user": user, "language": language, "added": added}
+
+    def parse_levels(self, data):
+        levels = data.get("levels") or []
+        if not isinstance(levels, list) or not all(isinstance(level, str) for level in levels):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Field 'levels' must be a list of strings.")
+        return tuple(check_name(level, "level") for level in levels)
+
+    def translate(self, words, target_language, provider="deep-google"):
+        translations = {}
+        for word in words:
+            key = (provider, target_language, word)
+            translation = self.translation_cache.get(key)
+            if translation is None:
+                translation = translate_word(word, target_language, provider=provider)
+                if translation != "Translation not available":
+                    self.translation_cache.put(key, translation)
+            translations[word] = translation
+        return {"target_language": target_language, "translations": translations}
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=DEFAULT_WORKERS, queue_size=DEFAULT_QUEUE_SIZE,
+          preload_languages=()):
+    """Run the analysis server until interrupted."""
+    server = AnalysisServer(host, port, workers, queue_size, preload_languages)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        logging.info("LinguaCraft server stopped.")
+
+
+def main(argv=None):
+    """Entry point for `linguacraft serve`."""
+    parser = argparse.ArgumentParser(prog="linguacraft serve", description="Run the local LinguaCraft analysis server.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Interface to bind (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Size of the worker pool")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE,
+                        help="Requests allowed to wait for a worker before answering 503")
+    parser.add_argument("--preload", default="", help="Comma-separated language codes whose models are loaded at startup")
+    args = parser.parse_args(argv)
+    preload_languages = [code.strip() for code in args.preload.split(",") if code.strip()]
+    serve(args.host, args.port, args.workers, args.queue_size, preload_languages)
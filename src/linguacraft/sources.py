@@ -0,0 +1,345 @@
+import codecs
+import logging
+import os
+import posixpath
+import shutil
+import tempfile
+import urllib.parse
+import urllib.request
+import xml.etree.ElementTree as ET
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from html.parser import HTMLParser
+from itertools import chain
+
+from linguacraft.preprocessing import DEFAULT_SIMILARITY_THRESHOLD, DuplicateFilter, log_report
+from linguacraft.text_processing import OccurrenceIndex, deduplicate_words, filter_known_words, normalize_words, tokenize_text
+
+# constants
+READ_CHUNK_SIZE = 64 * 1024  # Bytes read from a source at a time
+MAX_CHAPTER_CHARS = 100_000  # Longer chapters are split at a paragraph boundary
+SAMPLE_CHARS = 10_000  # Text used for language detection
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+
+SOURCE_TYPES = ("text", "html", "epub", "url")
+HTML_EXTENSIONS = (".html", ".htm", ".xhtml")
+
+# HTML elements whose content is not text, and elements that end a paragraph or a chapter
+SKIP_TAGS = {"script", "style", "head", "title", "noscript", "svg"}
+BLOCK_TAGS = {"p", "div", "br", "li", "tr", "section", "article", "blockquote", "pre",
+              "h1", "h2", "h3", "h4", "h5", "h6"}
+CHAPTER_TAGS = {"h1", "h2"}
+
+# Errors raised while reading a source
+SOURCE_ERRORS = (OSError, ValueError, zipfile.BadZipFile, ET.ParseError)
+
+
+def detect_source_type(source):
+    """
+    Detects the type of an input source.
+    Args:
+        source (str): A file path or a URL.
+    Returns:
+        str: One of 'url', 'epub', 'html' or 'text'.
+    """
+    scheme = urllib.parse.urlparse(source).scheme.lower()
+    if scheme in ("http", "https", "file"):
+        return "url"
+    lower = source.lower()
+    if lower.endswith(".epub"):
+        return "epub"
+    if lower.endswith(HTML_EXTENSIONS):
+        return "html"
+    return "text"
+
+
+class ChapterBuffer:
+    """Collects extracted text and hands out chapters no longer than MAX_CHAPTER_CHARS."""
+
+    def __init__(self, max_chars=MAX_CHAPTER_CHARS):
+        self.max_chars = max_chars
+        self.parts = []
+        self.size = 0
+
+    def append(self, text):
+        """Add text. Returns the chapters completed because the buffer became too large."""
+        self.parts.append(text)
+        self.size += len(text)
+        chapters = []
+        while self.size > self.max_chars:
+            buffered = "".join(self.parts)
+            # Prefer a paragraph boundary, then a word boundary, so no word is cut in half
+            cut = buffered.rfind("\n", 0, self.max_chars) + 1
+            if cut <= 0:
+                cut = buffered.rfind(" ", 0, self.max_chars) + 1
+            if cut <= 0:
+                cut = self.max_chars
+            chapters.append(buffered[:cut])
+            rest = buffered[cut:]
+            self.parts = [rest]
+            self.size = len(rest)
+        return [chapter for chapter in chapters if chapter.strip()]
+
+    def flush(self):
+        """End the current chapter. Returns it, or None if it holds no text."""
+        chapter = "".join(self.parts)
+        self.parts = []
+        self.size = 0
+        return chapter if chapter.strip() else None
+
+
+class HTMLTextExtractor(HTMLParser):
+    """Incremental HTML-to-text converter that splits the text into chapters at <h1>/<h2> headings."""
+
+    def __init__(self, split_on_headings=True):
+        super().__init__(convert_charrefs=True)
+        self.split_on_headings = split_on_headings
+        self.buffer = ChapterBuffer()
+        self.chapters = []
+        self.skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+        elif self.split_on_headings and tag in CHAPTER_TAGS:
+            self.end_chapter()
+        elif tag in BLOCK_TAGS:
+            self.chapters.extend(self.buffer.append("\n"))
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif tag in BLOCK_TAGS:
+            self.chapters.extend(self.buffer.append("\n"))
+
+    def handle_data(self, data):
+        if not self.skip_depth:
+            self.chapters.extend(self.buffer.append(data))
+
+    def end_chapter(self):
+        chapter = self.buffer.flush()
+        if chapter:
+            self.chapters.append(chapter)
+
+    def pop_chapters(self):
+        """Return and forget the chapters completed so far."""
+        chapters, self.chapters = self.chapters, []
+        return chapters
+
+
+def iter_html_chapters(stream, encoding="utf-8", split_on_headings=True):
+    """
+    Extracts text from an HTML byte stream chunk by chunk.
+    Args:
+        stream: A binary file-like object.
+        encoding (str): The encoding of the stream.
+        split_on_headings (bool): Start a new chapter at every <h1>/<h2>.
+    Yields:
+        str: The text of each chapter.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    parser = HTMLTextExtractor(split_on_headings=split_on_headings)
+    while True:
+        chunk = stream.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        parser.feed(decoder.decode(chunk))
+        yield from parser.pop_chapters()
+    parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+    parser.end_chapter()
+    yield from parser.pop_chapters()
+
+
+def iter_text_chapters(stream):
+    """
+    Reads plain text line by line.
+    Args:
+        stream: A text file-like object.
+    Yields:
+        str: Blocks of at most MAX_CHAPTER_CHARS characters, split at paragraph boundaries.
+    """
+    buffer = ChapterBuffer()
+    for line in stream:
+        yield from buffer.append(line)
+    chapter = buffer.flush()
+    if chapter:
+        yield chapter
+
+
+def iter_epub_chapters(file_path):
+    """
+    Extracts text from an EPUB file, one spine document (chapter) at a time.
+    Args:
+        file_path (str): The path to the EPUB file.
+    Yields:
+        str: The text of each chapter, in reading order.
+    """
+    namespaces = {
+        "container": "urn:oasis:names:tc:opendocument:xmlns:container",
+        "opf": "http://www.idpf.org/2007/opf",
+    }
+    with zipfile.ZipFile(file_path) as book:
+        container = ET.fromstring(book.read("META-INF/container.xml"))
+        rootfile = container.find(".//container:rootfile", namespaces)
+        opf_path = rootfile.get("full-path")
+        package = ET.fromstring(book.read(opf_path))
+
+        manifest = {item.get("id"): item.get("href") for item in package.iterfind(".//opf:manifest/opf:item", namespaces)}
+        opf_dir = posixpath.dirname(opf_path)
+        for itemref in package.iterfind(".//opf:spine/opf:itemref", namespaces):
+            href = manifest.get(itemref.get("idref"))
+            if not href:
+                continue
+            member = posixpath.normpath(posixpath.join(opf_dir, urllib.parse.unquote(href)))
+            try:
+                with book.open(member) as chapter:
+                    yield from iter_html_chapters(chapter, split_on_headings=False)
+            except KeyError:
+                logging.error(f"EPUB chapter '{member}' not found in {file_path}.")
+
+
+def iter_file_chapters(file_path, source_type):
+    """Yields the chapters of a local file of the given source type."""
+    if source_type == "epub":
+        yield from iter_epub_chapters(file_path)
+    elif source_type == "html":
+        with open(file_path, "rb") as f:
+            yield from iter_html_chapters(f)
+    else:
+        with open(file_path, "r", encoding="utf-8") as f:
+            yield from iter_text_chapters(f)
+
+
+def iter_url_chapters(url):
+    """
+    Streams the text of a file:// or http(s):// URL chapter by chapter.
+    Args:
+        url (str): The URL to read.
+    Yields:
+        str: The text of each chapter.
+    """
+    parsed = urllib.parse.urlparse(url)
+    if parsed.scheme == "file":
+        file_path = urllib.request.url2pathname(parsed.path)
+        yield from iter_file_chapters(file_path, detect_source_type(file_path))
+        return
+
+    with urllib.request.urlopen(url) as response:
+        content_type = response.headers.get_content_type()
+        charset = response.headers.get_content_charset() or "utf-8"
+        if content_type == "application/epub+zip" or parsed.path.lower().endswith(".epub"):
+            # EPUB needs random access: spool it to a temporary file first
+            with tempfile.NamedTemporaryFile(suffix=".epub") as tmp:
+                shutil.copyfileobj(response, tmp, READ_CHUNK_SIZE)
+                tmp.flush()
+                yield from iter_epub_chapters(tmp.name)
+        elif content_type in ("text/html", "application/xhtml+xml"):
+            yield from iter_html_chapters(response, encoding=charset)
+        else:
+            yield from iter_text_chapters(codecs.getreader(charset)(response, errors="replace"))
+
+
+def iter_source_chapters(source, source_type=None):
+    """
+    Reads an input source incrementally.
+    Args:
+        source (str): A file path (plain text, HTML or EPUB) or a file:// / http(s):// URL.
+        source_type (str): One of SOURCE_TYPES; detected from the source if omitted.
+    Yields:
+        str: The text of each chapter.
+    """
+    source_type = source_type or detect_source_type(source)
+    if source_type == "url":
+        yield from iter_url_chapters(source)
+    else:
+        yield from iter_file_chapters(source, source_type)
+
+
+def peek_source_sample(chapters, limit=SAMPLE_CHARS):
+    """
+    Reads the beginning of a chapter stream without losing it, so a source can be sampled
+    (e.g. for language detection) and analyzed in a single pass.
+    Args:
+        chapters (iterator): Chapters, e.g. from iter_source_chapters.
+        limit (int): The number of characters to sample.
+    Returns:
+        tuple: Up to `limit` characters of text, and an iterator over all chapters
+            (the chapters read for the sample first).
+    """
+    chapters = iter(chapters)
+    head = []
+    size = 0
+    for chapter in chapters:
+        head.append(chapter)
+        size += len(chapter)
+        if size >= limit:
+            break
+    return ("".join(head)[:limit], chain(head, chapters))
+
+
+def chapter_words(text, input_language, fast=False, index=None):
+    """Returns the set of normalized words of one chapter."""
+    tokens = deduplicate_words(tokenize_text(text, input_language, fast=fast, index=index))
+    return set(normalize_words(tokens, input_language, fast=fast, index=index))
+
+
+def process_source(source, known_words, input_language, source_type=None, max_workers=DEFAULT_WORKERS, fast=False,
+                   index=None, similarity_threshold=DEFAULT_SIMILARITY_THRESHOLD, chapters=None):
+    """
+    Processes a source chapter by chapter, then filters out known words.
+    Chapters are normalized in parallel while the source is still being read; at most
+    2 * max_workers chapters are held in memory at a time. Duplicate paragraphs and repeated boilerplate
+    lines are dropped across the whole source before the chapters are tokenized.
+    Args:
+        source (str): A file path or URL.
+        known_words (set): Set of known words to exclude.
+        input_language (str): The language code of the input text.
+        source_type (str): One of SOURCE_TYPES; detected from the source if omitted.
+        max_workers (int): Number of chapters processed in parallel.
+        fast (bool): Use lookup-table lemmatization instead of the full SpaCy pipeline.
+        index (OccurrenceIndex): If given, filled with the occurrences and context sentences of the words
+            (offsets refer to the extracted and cleaned text of the whole source).
+        similarity_threshold (float): Paragraphs at least this similar to an earlier one are dropped;
+            None disables the duplicate and boilerplate filtering.
+        chapters (iterator): The chapters of the source if they are already being read (see peek_source_sample);
+            otherwise the source is read from the start.
+    Returns:
+        list: List of unknown words in the text.
+    """
+    unique_words = set()
+    chapter_indexes = {}  # future -> (chapter index, offset of the chapter in the extracted text)
+    # One filter for the whole source, applied in reading order, so duplicates are found across chapters
+    duplicate_filter = DuplicateFilter(similarity_threshold) if similarity_threshold is not None else None
+
+    def collect(future):
+        unique_words.update(future.result())
+        (chapter_index, base_offset) = chapter_indexes.pop(future)
+        if chapter_index is not None:
+            index.merge(chapter_index, base_offset)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = set()
+        offset = 0
+        if chapters is None:
+            chapters = iter_source_chapters(source, source_type)
+        for chapter in chapters:
+            if duplicate_filter is not None:
+                chapter = duplicate_filter.filter(chapter)
+                if not chapter.strip():
+                    continue
+            if len(pending) >= 2 * max_workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(future)
+            chapter_index = OccurrenceIndex(index.max_occurrences) if index is not None else None
+            future = pool.submit(chapter_words, chapter, input_language, fast, chapter_index)
+            chapter_indexes[future] = (chapter_index, offset)
+            pending.add(future)
+            offset += len(chapter)
+        for future in pending:
+            collect(future)
+
+    if duplicate_filter is not None:
+        log_report(duplicate_filter.report)
+    return filter_known_words(list(unique_words), known_words)
@@ -1,9 +1,18 @@
 import logging
+import re
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 import spacy
 from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
 from spacy.cli import download
-from langdetect import detect
+from langdetect import DetectorFactory, detect
+from linguacraft.known_words import LayeredVocabulary, load_known_words
+from linguacraft.preprocessing import DEFAULT_SIMILARITY_THRESHOLD, strip_boilerplate
+
+# Make language detection deterministic, so the same paragraph is always routed the same way
+DetectorFactory.seed = 0
 
 # Ignore SSL certificate verification
 import ssl
@@ -99,16 +108,107 @@ def detect_language(text):
         logging.error(f"Language detection failed: {e}")
         return ""  # Default to empty string
 
+# Paragraphs shorter than this are too short for reliable detection and follow the previous paragraph
+MIN_ROUTING_CHARS = 40
+
+def split_paragraphs(text):
+    """Splits text into non-empty paragraphs separated by blank lines."""
+    return [paragraph.strip() for paragraph in re.split(r"\n\s*\n", text) if paragraph.strip()]
+
+def route_paragraphs(text):
+    """
+    Detects the language of each paragraph and groups the paragraphs by language.
+    Args:
+        text (str): The input text.
+    Returns:
+        dict: Language code -> list of paragraphs in that language, in document order.
+    """
+    groups = {}
+    previous_language = ""
+    for paragraph in split_paragraphs(text):
+        language = ""
+        if len(paragraph) >= MIN_ROUTING_CHARS or not previous_language:
+            language = detect_language(paragraph)
+        language = language or previous_language
+        if not language:
+            continue
+        groups.setdefault(language, []).append(paragraph)
+        previous_language = language
+    return groups
+
+# Loaded spaCy pipelines, kept for the lifetime of the process
+_loaded_models = {}
+_loaded_models_lock = threading.Lock()
+
 # Load the spaCy model for lemmaization
-def ensure_spacy_model(language):
-    """Ensure the required spaCy model is downloaded."""
+def ensure_spacy_model(language, download_missing=True):
+    """
+    Ensure the required spaCy model is downloaded and return the loaded (cached) pipeline.
+    Args:
+        language (str): The language code.
+        download_missing (bool): Download the model if it is not installed. Long-running services
+            pass False so a request never triggers a download.
+    Raises:
+        ValueError: If there is no SpaCy model for the language.
+        OSError: If the model is not installed and cannot (or may not) be downloaded.
+    """
     model_name = SPACY_MODELS.get(language)
-    try:
-        return spacy.load(model_name)
-    except Exception as e:
-        logging.error(f"Downloading SpaCy model '{model_name}'...")
-        download(model_name)
-        return spacy.load(model_name)
+    if model_name is None:
+        raise ValueError(f"No SpaCy model for language '{language}'.")
+    nlp = _loaded_models.get(model_name)
+    if nlp is not None:
+        return nlp
+    with _loaded_models_lock:
+        if model_name not in _loaded_models:
+            try:
+                _loaded_models[model_name] = spacy.load(model_name)
+            except Exception as e:
+                if not download_missing:
+                    raise OSError(f"SpaCy model '{model_name}' is not installed: {e}") from e
+                logging.error(f"Downloading SpaCy model '{model_name}'...")
+                try:
+                    download(model_name)
+                except SystemExit as error:
+                    # spacy.cli.download exits the interpreter when the download fails
+                    raise OSError(f"Downloading SpaCy model '{model_name}' failed.") from error
+                _loaded_models[model_name] = spacy.load(model_name)
+        return _loaded_models[model_name]
+
+# Blank pipelines with lookup-table lemmatization, used by the opt-in fast mode
+_lookup_pipelines = {}
+
+def ensure_lookup_pipeline(language):
+    """
+    Return a blank (tokenizer-only) pipeline with a lookup-table lemmatizer for the language.
+    The tables come from the optional spacy-lookups-data package.
+    Returns:
+        Language: The cached pipeline, or None if no lookup table is available for the language.
+    """
+    if language in _lookup_pipelines:
+        return _lookup_pipelines[language]
+    with _loaded_models_lock:
+        if language not in _lookup_pipelines:
+            try:
+                nlp = spacy.blank(language)
+                nlp.add_pipe("lemmatizer", config={"mode": "lookup"})
+                nlp.initialize()
+            except Exception as e:
+                logging.error(f"Lookup lemmatization for '{language}' is not available ({e}). Using the full SpaCy model.")
+                nlp = None
+            _lookup_pipelines[language] = nlp
+        return _lookup_pipelines[language]
+
+def load_pipelines(language, fast=False, download_missing=True):
+    """
+    Load the pipelines tokenize_text and normalize_words use for a language, so that model errors
+    surface here rather than in the middle of an analysis.
+    Raises:
+        ValueError: If there is no SpaCy model for the language.
+        OSError: If the model is not installed and may not be downloaded.
+    """
+    if fast and ensure_lookup_pipeline(language) is not None:
+        return
+    ensure_spacy_model(language, download_missing=download_missing)
 
 def read_text_file(file_path):
     """
@@ -125,17 +225,129 @@ def read_text_file(file_path):
         logging.error(f"Error: The file at {file_path} was not found.")
         return ""
 
-def tokenize_text(text, language_code="en"):
+# Bounds of the occurrence index: per word form at most this many occurrences and one context sentence
+MAX_OCCURRENCES_PER_WORD = 8
+MAX_CONTEXT_CHARS = 200
+SENTENCE_PATTERN = re.compile(r"[^.!?…\n]+(?:[.!?…]+|\n|$)")
+
+class OccurrenceIndex:
+    """
+    Compact index, built during tokenization, of where each word occurs in the text.
+    For every word form it keeps the character offsets and sentence spans of its first
+    occurrences (flattened into an int array) and its first context sentence; normalization
+    links the forms to their lemmas. The size is bounded by the number of distinct forms.
+    """
+
+    def __init__(self, max_occurrences=MAX_OCCURRENCES_PER_WORD):
+        self.max_occurrences = max_occurrences
+        self.spans = {}  # form -> array of (offset, sentence_start, sentence_end) triples
+        self.counts = {}  # form -> total number of occurrences
+        self.contexts = {}  # form -> (offset, context sentence) of the first occurrence
+        self.lemma_forms = {}  # lemma -> set of forms
+
+    def record(self, form, offset, sentence_start, sentence_end, text):
+        """Record one occurrence of a word form; `text` is the text the offsets refer to."""
+        count = self.counts.get(form, 0)
+        self.counts[form] = count + 1
+        if count >= self.max_occurrences:
+            return
+        spans = self.spans.get(form)
+        if spans is None:
+            spans = self.spans[form] = array("l")
+            sentence = " ".join(text[sentence_start:sentence_end].split())
+            self.contexts[form] = (offset, sentence[:MAX_CONTEXT_CHARS])
+        spans.extend((offset, sentence_start, sentence_end))
+
+    def link(self, form, lemma):
+        """Link a word form to the lemma it was normalized to."""
+        self.lemma_forms.setdefault(lemma, set()).add(form)
+
+    def forms(self, word):
+        return self.lemma_forms.get(word, {word})
+
+    def occurrences(self, word):
+        """
+        Returns the recorded occurrences of a lemma (or form).
+        Returns:
+            list: (offset, sentence_start, sentence_end) tuples, in text order.
+        """
+        result = []
+        for form in self.forms(word):
+            spans = self.spans.get(form, ())
+            result.extend(tuple(spans[i:i + 3]) for i in range(0, len(spans), 3))
+        return sorted(result)[:self.max_occurrences]
+
+    def count(self, word):
+        """Returns the total number of occurrences of a lemma (or form)."""
+        return sum(self.counts.get(form, 0) for form in self.forms(word))
+
+    def context(self, word):
+        """Returns the first sentence in which a lemma (or form) occurs, or an empty string."""
+        contexts = [self.contexts[form] for form in self.forms(word) if form in self.contexts]
+        return min(contexts)[1] if contexts else ""
+
+    def contexts_for(self, words):
+        """Returns a dict word -> context sentence for the words that have one."""
+        contexts = {}
+        for word in words:
+            context = self.context(word)
+            if context:
+                contexts[word] = context
+        return contexts
+
+    def merge(self, other, base_offset=0):
+        """Merge the index of a later part of the text (e.g. a chapter) starting at `base_offset`."""
+        for form, count in other.counts.items():
+            self.counts[form] = self.counts.get(form, 0) + count
+        for form, spans in other.spans.items():
+            shifted = [value + base_offset for value in spans]
+            merged = sorted(
+                [tuple(self.spans[form][i:i + 3]) for i in range(0, len(self.spans.get(form, ())), 3)]
+                + [tuple(shifted[i:i + 3]) for i in range(0, len(shifted), 3)]
+            )[:self.max_occurrences]
+            self.spans[form] = array("l", [value for triple in merged for value in triple])
+        for form, (offset, context) in other.contexts.items():
+            offset += base_offset
+            if form not in self.contexts or offset < self.contexts[form][0]:
+                self.contexts[form] = (offset, context)
+        for lemma, forms in other.lemma_forms.items():
+            self.lemma_forms.setdefault(lemma, set()).update(forms)
+
+def sentence_spans(doc, text):
+    """Returns the (start, end) character spans of the sentences of a document."""
+    if doc.has_annotation("SENT_START"):
+        return [(sentence.start_char, sentence.end_char) for sentence in doc.sents]
+    # Blank pipelines have no sentence boundaries: split on sentence punctuation and line breaks
+    return [match.span() for match in SENTENCE_PATTERN.finditer(text)]
+
+def tokenize_text(text, language_code="en", fast=False, index=None):
     """
     Tokenizes text into individual words using SpaCy based on the language.
     Args:
         text (str): The input text.
         language_code (str): The language code of the text.
+        fast (bool): Use only the rule-based tokenizer of a blank pipeline instead of the full model.
+        index (OccurrenceIndex): If given, the offsets and sentences of the tokens are recorded in it.
     Returns:
         list: A list of words (tokens).
     """
-    nlp = ensure_spacy_model(language=language_code)
-    doc = nlp(text)
+    lookup_nlp = ensure_lookup_pipeline(language_code) if fast else None
+    if lookup_nlp is not None:
+        doc = lookup_nlp.make_doc(text)
+    else:
+        nlp = ensure_spacy_model(language=language_code)
+        doc = nlp(text)
+    if index is not None:
+        # Tokens and sentences are both in text order: walk them together in one pass
+        spans = sentence_spans(doc, text) or [(0, len(text))]
+        sentence = 0
+        for token in doc:
+            if not token.is_alpha:
+                continue
+            while sentence < len(spans) - 1 and token.idx >= spans[sentence][1]:
+                sentence += 1
+            start, end = spans[sentence]
+            index.record(token.text.lower(), token.idx, start, end, text)
     # Tokenize the text and filter out non-alphabetic tokens
     tokens = [token.text.lower() for token in doc if token.is_alpha]
     return tokens
@@ -153,16 +365,28 @@ def get_stop_words(language_code="en"):
         logging.error(f"An unexpected error occurred: {e}")
         return set()
     
-def normalize_words(tokens, language_code):
+def normalize_words(tokens, language_code, fast=False, index=None):
     """
     Normalizes words by lemmatizing and filtering out stopwords.
     Args:
         tokens (list): List of words (tokens) to normalize.
         language_code (str): The language code of the text.
+        fast (bool): Lemmatize with a lookup table instead of the statistical pipeline.
+            Much faster, but there is no part-of-speech tagging (no 'to' prefix for English verbs).
+        index (OccurrenceIndex): If given, each token is linked to its lemma in it.
     Returns:
         list: A list of normalized words.
     """
     STOP_WORDS = get_stop_words(language_code)
+    lookup_nlp = ensure_lookup_pipeline(language_code) if fast else None
+    if lookup_nlp is not None:
+        lemma_table = lookup_nlp.get_pipe("lemmatizer").lookups.get_table("lemma_lookup")
+        lemmatized_words = [lemma_table.get(word, word) for word in tokens if word not in STOP_WORDS]
+        if index is not None:
+            for word, lemma in zip((word for word in tokens if word not in STOP_WORDS), lemmatized_words):
+                index.link(word, lemma)
+        return lemmatized_words
+
     lemmatized_words = []
     nlp = ensure_spacy_model(language=language_code)
     for word in tokens:
@@ -174,6 +398,8 @@ def normalize_words(tokens, language_code):
                 if language_code == "en" and token.pos_ == "VERB":
                     lemma = f"to {lemma}"
                 lemmatized_words.append(lemma)
+                if index is not None:
+                    index.link(word, lemma)
     return lemmatized_words
 
 def deduplicate_words(words):
@@ -191,34 +417,65 @@ def filter_known_words(words, known_words):
     Filters out known words from the list of normalized words.
     Args:
         words (list): List of normalized, deduplicated words.
-        known_words (set): Set of known words to exclude.
+        known_words (set or LayeredVocabulary): Known words to exclude.
     Returns:
         list: A list of words that are not in the known words list.
     """
+    if isinstance(known_words, LayeredVocabulary):
+        # Layers are stored lowercase: check membership through them without building the union
+        return [word for word in words if word.lower() not in known_words]
+
     # Convert known words to lowercase to ensure case-insensitive comparison
     known_words_lower = {word.lower() for word in known_words}
     return [word for word in words if word.lower() not in known_words_lower]
 
-def process_text(file_path, known_words, input_language):
+def process_text(file_path, known_words, input_language, fast=False, index=None,
+                 similarity_threshold=DEFAULT_SIMILARITY_THRESHOLD):
     """
     Processes text from a file, normalizes and deduplicates it, then filters out known words.
     Args:
         file_path (str): Path to the text file to process.
         known_words (set): Set of known words to exclude.
         input_language (str): The language code of the input text.
+        fast (bool): Use lookup-table lemmatization instead of the full SpaCy pipeline.
+        index (OccurrenceIndex): If given, filled with the occurrences and context sentences of the words.
+        similarity_threshold (float): Threshold for dropping near-duplicate paragraphs (see analyze_text).
     Returns:
         list: List of unknown words in the text.
     """
     # Read text from file
     text = read_text_file(file_path)
+    return analyze_text(text, known_words, input_language, fast=fast, index=index,
+                        similarity_threshold=similarity_threshold)
+
+def analyze_text(text, known_words, input_language, fast=False, index=None,
+                 similarity_threshold=DEFAULT_SIMILARITY_THRESHOLD):
+    """
+    Normalizes and deduplicates the given text, then filters out known words.
+    Args:
+        text (str): The text to analyze.
+        known_words (set): Set of known words to exclude.
+        input_language (str): The language code of the input text.
+        fast (bool): Use lookup-table lemmatization instead of the full SpaCy pipeline.
+        index (OccurrenceIndex): If given, filled with the occurrences and context sentences of the words
+            (offsets refer to the text after boilerplate stripping).
+        similarity_threshold (float): Duplicate paragraphs, paragraphs at least this similar to an earlier one and
+            recurring boilerplate lines are removed before tokenization; None keeps the text as is.
+    Returns:
+        list: List of unknown words in the text.
+    """
     if not text:
-        return []  # Return empty word list if file is empty or not found
-    
+        return []  # Return empty word list if text is empty or file not found
+
+    # Drop duplicate paragraphs and boilerplate (headers, footers, repeated subtitle lines)
+    if similarity_threshold is not None:
+        (text, _) = strip_boilerplate(text, similarity_threshold)
+
     # Tokenize the text
-    tokens = tokenize_text(text, input_language)
+    tokens = tokenize_text(text, input_language, fast=fast, index=index)
 
     # Normalize (lemmatize) the tokens
-    normalized_words = normalize_words(tokens, input_language)
+    normalized_words = normalize_words(tokens, input_language, fast=fast, index=index)
 
     # Deduplicate the list of words
     unique_words = deduplicate_words(normalized_words)
@@ -226,4 +483,43 @@ def process_text(file_path, known_words, input_language):
     # Filter out known words
     unknown_words = filter_known_words(unique_words, known_words)
 
-    return unknown_words
\ No newline at end of file
+    return unknown_words
+
+def analyze_text_by_language(text, load_known=None, max_workers=None, fast=False, download_missing=True):
+    """
+    Routes the paragraphs of a mixed-language text by language and analyzes each group with its own model.
+    Groups are processed concurrently (one after another with max_workers=1, e.g. when already running on
+    a worker of a bounded pool); each is filtered against the known words of its language.
+    Args:
+        text (str): The text to analyze.
+        load_known (callable): Returns the known words for a language code (default: known_words_<lang>.txt).
+        max_workers (int): Number of language groups processed in parallel (default: one per group).
+        fast (bool): Use lookup-table lemmatization instead of the full SpaCy pipelines.
+        download_missing (bool): Download missing models; if False, languages whose model is not installed are skipped.
+    Returns:
+        dict: Language code -> list of unknown words in that language.
+    """
+    if load_known is None:
+        load_known = lambda language: load_known_words(language)[0]
+
+    groups = route_paragraphs(text)
+    for language in [language for language in groups if language not in SPACY_MODELS]:
+        logging.error(f"No SpaCy model for language '{language}'. Skipping {len(groups[language])} paragraph(s).")
+        del groups[language]
+    for language in list(groups):
+        try:
+            load_pipelines(language, fast=fast, download_missing=download_missing)
+        except OSError as e:
+            logging.error(f"{e} Skipping {len(groups[language])} paragraph(s).")
+            del groups[language]
+    if not groups:
+        return {}
+
+    def analyze_group(language, paragraphs):
+        return analyze_text("\n\n".join(paragraphs), load_known(language), language, fast=fast)
+
+    if max_workers == 1 or len(groups) == 1:
+        return {language: analyze_group(language, paragraphs) for language, paragraphs in groups.items()}
+    with ThreadPoolExecutor(max_workers=max_workers or len(groups)) as pool:
+        futures = {language: pool.submit(analyze_group, language, paragraphs) for language, paragraphs in groups.items()}
+    return {language: future.result() for language, future in futures.items()}
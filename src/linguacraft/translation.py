@@ -4,11 +4,18 @@ from deep_translator import GoogleTranslator
 import requests
 import os
 
+from linguacraft.translation_bulk import output_file_for_target, parse_target_languages
+
 # Set up API keys
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 GOOGLE_TRANSLATE_API_KEY = os.getenv("GOOGLE_TRANSLATE_API_KEY")
 MICROSOFT_TRANSLATOR_API_KEY = os.getenv("MICROSOFT_TRANSLATOR_API_KEY")
 MICROSOFT_TRANSLATOR_ENDPOINT = os.getenv("MICROSOFT_TRANSLATOR_ENDPOINT")
+# Overridable to point at a local stand-in server (see benchmarks/provider_stub.py)
+GOOGLE_TRANSLATE_ENDPOINT = os.getenv("GOOGLE_TRANSLATE_ENDPOINT", "https://translation.googleapis.com/language/translate/v2")
+
+# Words per batched translation request
+TRANSLATION_BATCH_SIZE = 100
 
 # Configure OpenAI API
 OpenAI.api_key = OPENAI_API_KEY
@@ -39,7 +46,7 @@ def translate_word_google(word, target_language):
     """
     Translates a word into the target language using the Google Translate API.
     """
-    url = "https://translation.googleapis.com/language/translate/v2"
+    url = GOOGLE_TRANSLATE_ENDPOINT
     params = {
         "q": word,
         "target": target_language,
@@ -101,23 +108,161 @@ def translate_word(word, target_language, provider="deep-google"):
         raise ValueError("Unsupported translation provider. Use 'google', 'microsoft', or 'deep-google'.")
 
 
-def fetch_translation(unknown_words, target_language, provider="deep-google"):
+def translate_words_google(words, target_language):
     """
-    Fetches definitions and translations for a list of unknown words.
+    Translates a batch of words into the target language with one Google Translate API request per chunk.
+    Returns:
+        dict: Word -> translation.
     """
     translations = {}
-    for word in unknown_words:
-        definition = get_definition(word)
-        translation = translate_word(word, target_language, provider=provider)
-        translations[word] = {
-            "definition": definition,
-            "translation": translation,
+    for start in range(0, len(words), TRANSLATION_BATCH_SIZE):
+        chunk = words[start:start + TRANSLATION_BATCH_SIZE]
+        params = {
+            "q": chunk,
+            "target": target_language,
+            "key": GOOGLE_TRANSLATE_API_KEY,
         }
-        logging.info(f"Processed '{word}': Definition - '{definition}', Translation - '{translation}'")
-    save_translations_to_file(translations)
+        try:
+            response = requests.post(GOOGLE_TRANSLATE_ENDPOINT, data=params)
+            response_data = response.json()
+            for word, item in zip(chunk, response_data["data"]["translations"]):
+                translations[word] = item["translatedText"]
+        except Exception as e:
+            logging.error(f"Error translating {len(chunk)} words using Google Translate: {e}")
+            translations.update((word, "Translation not available") for word in chunk)
+    return translations
+
+
+def translate_words_microsoft(words, target_languages):
+    """
+    Translates a batch of words into all target languages with one Microsoft Translator request per chunk.
+    Returns:
+        dict: Target language -> dict of word -> translation.
+    """
+    url = f"{MICROSOFT_TRANSLATOR_ENDPOINT}/translate"
+    headers = {
+        "Ocp-Apim-Subscription-Key": MICROSOFT_TRANSLATOR_API_KEY,
+        "Ocp-Apim-Subscription-Region": "global",
+        "Content-Type": "application/json",
+    }
+    translations = {target: {} for target in target_languages}
+    for start in range(0, len(words), TRANSLATION_BATCH_SIZE):
+        chunk = words[start:start + TRANSLATION_BATCH_SIZE]
+        body = [{"Text": word} for word in chunk]
+        params = {"to": target_languages}
+        try:
+            response = requests.post(url, headers=headers, json=body, params=params)
+            response_data = response.json()
+            for word, item in zip(chunk, response_data):
+                for translation in item["translations"]:
+                    translations[translation["to"]][word] = translation["text"]
+        except Exception as e:
+            logging.error(f"Error translating {len(chunk)} words using Microsoft Translator: {e}")
+        for target in target_languages:
+            for word in chunk:
+                translations[target].setdefault(word, "Translation not available")
     return translations
 
 
+def translate_words_openai(words, target_languages):
+    """
+    Translates a list of words into several target languages using the OpenAI API.
+    Each batch of TRANSLATION_BATCH_SIZE words is one request covering all target languages.
+    Returns:
+        dict: Target language -> dict of word -> translation.
+    """
+    translations = {target: {} for target in target_languages}
+    target_list = ", ".join(f"'{target}'" for target in target_languages)
+    order = "; ".join(f"translation into '{target}'" for target in target_languages)
+    for start in range(0, len(words), TRANSLATION_BATCH_SIZE):
+        chunk = words[start:start + TRANSLATION_BATCH_SIZE]
+        prompt = f"Translate the following words into {target_list}:\n" + "\n".join(chunk)
+        prompt += f"\n\nFormat the response as one line per word: 'word:\t{order}'."
+        try:
+            client = OpenAI()
+            completion = client.chat.completions.create(
+                model="gpt-4o",
+                messages=[
+                    {
+                        "role": "user",
+                        "content": prompt
+                    }
+                ]
+            )
+            for line in completion.choices[0].message.content.splitlines():
+                # Tolerate list markers, quotes and bold markup around the entry
+                word, separator, rest = line.strip().lstrip("-• ").strip("'").partition(":")
+                word = word.strip().strip("*").strip()
+                if not separator or word not in chunk:
+                    continue
+                for target, translation in zip(target_languages, rest.split(";")):
+                    translations[target][word] = translation.strip()
+        except Exception as e:
+            logging.error(f"Error translating {len(chunk)} words using OpenAI: {e}")
+        for target in target_languages:
+            for word in chunk:
+                translations[target].setdefault(word, "Translation not available")
+    return translations
+
+
+def translate_words(words, target_languages, provider="deep-google"):
+    """
+    Translates a list of words into several target languages, batching requests where the provider allows it.
+    'deep-google' makes one call per word and target; with several targets, the words are translated
+    with Microsoft Translator instead (all targets in one request) if it is configured, otherwise with
+    OpenAI, so the number of calls grows with the number of words only.
+    Returns:
+        dict: Target language -> dict of word -> translation.
+    """
+    if provider == "deep-google" and len(target_languages) > 1:
+        provider = "microsoft" if MICROSOFT_TRANSLATOR_API_KEY else "openai"
+        logging.info(f"Translating into {len(target_languages)} languages using '{provider}' (batched).")
+    if provider == "microsoft":
+        return translate_words_microsoft(words, target_languages)
+    if provider == "google":
+        return {target: translate_words_google(words, target) for target in target_languages}
+    if provider == "openai":
+        return translate_words_openai(words, target_languages)
+    if provider == "deep-google":
+        return {target: {word: translate_word_deep(word, target) for word in words} for target in target_languages}
+    raise ValueError("Unsupported translation provider. Use 'google', 'microsoft', 'openai', or 'deep-google'.")
+
+
+def fetch_translation(unknown_words, target_language, provider="deep-google", filename="output.txt"):
+    """
+    Fetches definitions and translations for a list of unknown words.
+    With several target languages, each definition is fetched once and shared by all targets,
+    translations are batched, and the output is written to one file per target (see output_file_for_target).
+    Args:
+        unknown_words (list): List of words to define and translate.
+        target_language (str or list): The target language code, comma-separated codes ('uk,de') or a list of codes.
+        filename (str): The output file name.
+    Returns:
+        dict: Word -> {"definition", "translation"}; for several targets, target -> that dict.
+    """
+    target_languages = parse_target_languages(target_language)
+    definitions = {word: get_definition(word) for word in unknown_words}
+    translated = translate_words(list(unknown_words), target_languages, provider=provider)
+
+    results = {}
+    for target in target_languages:
+        translations = {}
+        for word in unknown_words:
+            translations[word] = {
+                "definition": definitions[word],
+                "translation": translated[target][word],
+            }
+            logging.info(f"Processed '{word}': Definition - '{definitions[word]}', Translation ({target}) - '{translated[target][word]}'")
+        results[target] = translations
+
+    if len(target_languages) == 1:
+        save_translations_to_file(results[target_languages[0]], filename)
+        return results[target_languages[0]]
+    for target, translations in results.items():
+        save_translations_to_file(translations, filename=output_file_for_target(filename, target))
+    return results
+
+
 def save_translations_to_file(translations, filename="output.txt"):
     """
     Saves translations and definitions to a file.
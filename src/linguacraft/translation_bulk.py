@@ -11,45 +11,162 @@ load_dotenv(dotenv_path=env_path)
 # Configure OpenAI API
 OpenAI.api_key = os.getenv("OPENAI_API_KEY")
 
-def fetch_definitions_bulk(unknown_words, input_language, target_language):
+def parse_target_languages(target_language):
+    """
+    Normalizes the target language argument.
+    Args:
+        target_language (str or list): A language code, comma-separated codes ('uk,de') or a list of codes.
+    Returns:
+        list: The target language codes.
+    """
+    if isinstance(target_language, str):
+        target_language = target_language.split(",")
+    return [code.strip() for code in target_language if code.strip()]
+
+def fetch_definitions_bulk(unknown_words, input_language, target_language, filename="output.txt"):
     """
     Fetches definitions and translations for a list of unknown words.
+    With several target languages, the definitions are requested once and the translations
+    into all targets are returned by the same request; the output is written per target.
     Args:
         unknown_words (list): List of words to translate and define.
-        target_language (str): The language code for the target language (default is 'ua').
+        target_language (str or list): The target language code(s) (default is 'ua').
+        filename (str): The output file name.
+    Returns:
+        definitions (str): The definitions and translations, one word per line.
     """
     definitions = get_definition_bulk(unknown_words, input_language, target_language)
-    save_output_file(definitions)
+    save_output_files(definitions, filename, target_language)
+    return definitions
 
-def get_definition_bulk(words, input_language, target_language):
+def get_definition_bulk(words, input_language, target_language, contexts=None):
     """
     Fetches definitions and translations for a list of unknown words.
     Args:
         words (list): List of words to define.
+        contexts (dict): Optional example sentence for each word, used to pick the meaning that fits.
     Returns:
         llm_response (str): The response from the OpenAI API, formatted as a list of words and their definitions.
     """
-    
-    prompt = f"Provide clear and concise dictionary definitions in '{input_language}', and translations from '{input_language}' into '{target_language}' for the following words:\n"
-    prompt += "\n".join(words)
-    prompt += "\n\nFormat the response as 'word:\tdefinition; translation'. For example:\n'car:\ta vehicle with four wheels; машина'."
+    return "\n".join(stream_definitions_bulk(words, input_language, target_language, contexts))
 
+def build_definitions_prompt(words, input_language, target_language, contexts=None):
+    """
+    Builds the prompt asking for definitions and translations of the words.
+    Args:
+        words (list): List of words to define.
+        contexts (dict): Optional example sentence for each word.
+    Returns:
+        prompt (str): The prompt for the LLM.
+    """
+    contexts = contexts or {}
+    targets = parse_target_languages(target_language)
+    target_list = ", ".join(f"'{target}'" for target in targets)
+    prompt = f"Provide clear and concise dictionary definitions in '{input_language}', and translations from '{input_language}' into {target_list} for the following words:\n"
+    prompt += "\n".join(f"{word} | {contexts[word]}" if word in contexts else word for word in words)
+    if contexts:
+        prompt += "\n\nText after '|' is an example sentence from the text; define the meaning used there and do not repeat the sentence."
+    if len(targets) == 1:
+        prompt += "\n\nFormat the response as 'word:\tdefinition; translation'. For example:\n'car:\ta vehicle with four wheels; машина'."
+    else:
+        translations = "; ".join(f"translation into '{target}'" for target in targets)
+        prompt += f"\n\nFormat the response as 'word:\tdefinition; {translations}', with one definition and the translations in exactly this order."
+    return prompt
+
+def stream_definitions_bulk(words, input_language, target_language, contexts=None):
+    """
+    Streams definitions and translations for a list of unknown words from the OpenAI API.
+    Args:
+        words (list): List of words to define.
+        contexts (dict): Optional example sentence for each word.
+    Yields:
+        line (str): Each non-empty line of the response, as soon as it is complete.
+    """
+    prompt = build_definitions_prompt(words, input_language, target_language, contexts)
     try:
         client = OpenAI()
-        completion = client.chat.completions.create(
+        stream = client.chat.completions.create(
             model="gpt-4o",
             messages=[
                 {
                     "role": "user",
                     "content": prompt
                 }
-            ]
+            ],
+            stream=True
         )
-        llm_response = completion.choices[0].message.content.strip()
-        return llm_response
+        buffer = ""
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            buffer += chunk.choices[0].delta.content or ""
+            # Hand out every completed line immediately
+            while "\n" in buffer:
+                line, buffer = buffer.split("\n", 1)
+                if line.strip():
+                    yield line.strip()
+        if buffer.strip():
+            yield buffer.strip()
     except Exception as e:
         logging.error(f"Error fetching definitions and translations: {e}")
-        return(f"Error fetching definitions and translations: {e}")
+        yield f"Error fetching definitions and translations: {e}"
+
+def parse_definition_line(line, target_count=1):
+    """
+    Parses one response line in the 'word:\tdefinition; translation[; translation...]' format.
+    Args:
+        line (str): A line of the LLM response.
+        target_count (int): Number of translations expected after the definition.
+    Returns:
+        tuple: (word, definition, translation, ...) with one translation per target,
+            or None if the line does not match the format.
+    """
+    # Tolerate list markers, quotes and bold markup around the entry
+    word, separator, rest = line.strip().lstrip("-• ").strip("'").partition(":")
+    word = word.strip().strip("*").strip()
+    if not separator or not word or not rest.strip():
+        return None
+    # The definition may contain ';' itself, so the translations are taken from the end
+    parts = [part.strip() for part in rest.rsplit(";", target_count)]
+    definition, translations = parts[0], parts[1:]
+    translations += [""] * (target_count - len(translations))  # Missing translations
+    return (word, definition, *translations)
+
+def output_file_for_target(filename, target_language):
+    """Returns the output file name for one target language, e.g. 'output_de.txt'."""
+    root, extension = os.path.splitext(filename)
+    return f"{root}_{target_language}{extension or '.txt'}"
+
+def save_output_files(definitions, filename, target_language):
+    """
+    Saves definitions to the output file, or to one file per target language if there are several.
+    Args:
+        definitions (str): The LLM response, one word per line.
+        filename (str): The file name for saving the output.
+        target_language (str or list): The target language code(s).
+    Returns:
+        list: The names of the written files.
+    """
+    targets = parse_target_languages(target_language)
+    if len(targets) <= 1:
+        save_output_file(definitions, filename)
+        return [filename]
+
+    per_target = {target: [] for target in targets}
+    for line in definitions.splitlines():
+        parsed = parse_definition_line(line, len(targets))
+        if parsed is None:
+            continue
+        (word, definition, *translations) = parsed
+        for target, translation in zip(targets, translations):
+            per_target[target].append(f"{word}:\t{definition}; {translation}")
+
+    filenames = []
+    for target, lines in per_target.items():
+        target_file = output_file_for_target(filename, target)
+        save_output_file("\n".join(lines), target_file)
+        filenames.append(target_file)
+    return filenames
 
 def save_output_file(definitions, filename="output.txt"):
     """
@@ -0,0 +1,130 @@
+from bisect import bisect_left
+from itertools import compress
+
+# Swaps the known (1) and unknown (0) status bytes
+_INVERT_STATUS = bytes.maketrans(b"\x00\x01", b"\x01\x00")
+NO_VALUE = "---"
+# Sorts after any character, so prefix + _MAX_CHAR bounds all words starting with prefix
+_MAX_CHAR = chr(0x10FFFF)
+
+
+class WordItemStore:
+    """
+    Columnar storage for the review state of candidate words.
+    Words are kept in a list, statuses in a bytearray (one byte per word, 1 = known),
+    and translations/definitions only for the words that have one.
+    A sorted prefix index over the words is built by build_search_index (or on the first search).
+    """
+    __slots__ = ("words", "status", "translations", "definitions", "_search_keys", "_search_indexes")
+
+    def __init__(self, words=()):
+        self.words = list(words)
+        self.status = bytearray(len(self.words))  # Default status is unknown
+        self.translations = {}  # index -> translation
+        self.definitions = {}  # index -> definition
+        self._search_keys = None  # Case-folded words in sorted order
+        self._search_indexes = None  # Index of the word at each position of _search_keys
+
+    def __len__(self):
+        return len(self.words)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.words)
+        if not 0 <= index < len(self.words):
+            raise IndexError("word item index out of range")
+        return WordItem(self, index)
+
+    def __iter__(self):
+        return (WordItem(self, index) for index in range(len(self.words)))
+
+    def toggle_status(self, index, known=None):
+        """Toggle or set the known/unknown status of the word at the given index."""
+        if known is None:
+            self.status[index] ^= 1
+        else:
+            self.status[index] = 1 if known else 0
+
+    def known_words(self):
+        """Return all words marked as known."""
+        return list(compress(self.words, self.status))
+
+    def unknown_words(self):
+        """Return all words marked as unknown."""
+        return list(compress(self.words, self.status.translate(_INVERT_STATUS)))
+
+    def build_search_index(self):
+        """Build the prefix index used by search (about 25 ms for 50k words); does nothing if it exists."""
+        if self._search_keys is not None:
+            return
+        folded = [word.casefold() for word in self.words]
+        indexes = sorted(range(len(folded)), key=folded.__getitem__)
+        self._search_indexes = indexes
+        self._search_keys = [folded[index] for index in indexes]
+
+    def search(self, prefix):
+        """
+        Find the words starting with the given prefix (case-insensitive).
+        Uses binary search on the sorted prefix index, so the cost depends on the number of matches,
+        not on the number of words.
+        Returns:
+            list: Indexes of the matching words, in ascending order.
+        """
+        prefix = prefix.strip().casefold()
+        if not prefix:
+            return list(range(len(self.words)))
+        self.build_search_index()
+        start = bisect_left(self._search_keys, prefix)
+        end = bisect_left(self._search_keys, prefix + _MAX_CHAR, start)
+        return sorted(self._search_indexes[start:end])
+
+    def known_count(self):
+        """Return the number of words marked as known."""
+        return self.status.count(1)
+
+
+class WordItem:
+    """Represents a word with a known/unknown status (a view on one row of a WordItemStore)."""
+    __slots__ = ("store", "index")
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    @property
+    def word(self):
+        return self.store.words[self.index]
+
+    @property
+    def is_known(self):
+        return self.store.status[self.index] == 1
+
+    @is_known.setter
+    def is_known(self, known):
+        self.store.toggle_status(self.index, known=known)
+
+    @property
+    def translation(self):
+        """Translation of the word."""
+        return self.store.translations.get(self.index, NO_VALUE)
+
+    @translation.setter
+    def translation(self, translation):
+        self.store.translations[self.index] = translation
+
+    @property
+    def definition(self):
+        """Definition of the word."""
+        return self.store.definitions.get(self.index, NO_VALUE)
+
+    @definition.setter
+    def definition(self, definition):
+        self.store.definitions[self.index] = definition
+
+    def toggle_status(self, known=None):
+        """Toggle or set the known/unknown status of the word."""
+        self.store.toggle_status(self.index, known=known)
+
+    def display_status(self):
+        """Return the display label based on the known/unknown status."""
+        return "Known" if self.is_known else "Unknown"
@@ -0,0 +1,66 @@
+from linguacraft.preprocessing import DuplicateFilter, strip_boilerplate
+
+DIALOGUE = [
+    "Where did you put the keys?",
+    "I left them on the kitchen table.",
+    "They are not there anymore.",
+    "Maybe the dog took them again.",
+    "Your dog steals everything shiny.",
+    "Then we should look in his basket.",
+]
+
+SRT = "\n\n".join(
+    f"{number}\n00:00:{number:02d},000 --> 00:00:{number + 1:02d},500\n{line}"
+    for number, line in enumerate(DIALOGUE, 1)
+) + "\n"
+
+PARAGRAPH = (
+    "The old lighthouse keeper walked along the rocky shore every single evening, looking for ships "
+    "on the horizon and collecting driftwood that the winter storms had carried into the small harbour."
+)
+
+
+def filter_in_chunks(text, size=50):
+    duplicate_filter = DuplicateFilter()
+    return "".join(duplicate_filter.filter(text[i:i + size]) for i in range(0, len(text), size))
+
+
+def test_subtitle_cues_are_not_near_duplicates():
+    cleaned, report = strip_boilerplate(SRT)
+    for line in DIALOGUE:
+        assert line in cleaned
+    assert report["near_duplicate_blocks"] == 0
+    assert report["duplicate_blocks"] == 0
+    assert DuplicateFilter().filter(SRT) == cleaned
+
+
+def test_repeated_short_lines_keep_their_first_occurrence():
+    text = "\n\n".join(f"{number}\n00:00:{number:02d},000 --> 00:00:{number + 1:02d},000\nRun!\nNow, {name}."
+                       for number, name in enumerate(["Anna", "Bob", "Carl"], 1))
+    cleaned, report = strip_boilerplate(text)
+    assert cleaned.count("Run!") == 1
+    assert "Now, Anna." in cleaned and "Now, Carl." in cleaned
+    assert report["boilerplate_lines"] > 0
+
+
+def test_streamed_and_whole_text_filtering_agree():
+    text = "\n\n".join(["Chapter header", PARAGRAPH, "Chapter header", PARAGRAPH, SRT])
+    (cleaned, _) = strip_boilerplate(text)
+    assert cleaned.count("Chapter header") == 1
+    assert filter_in_chunks(text, size=len(text)) == cleaned
+
+
+def test_near_duplicate_paragraphs_are_removed():
+    # Same words, different punctuation and case (e.g. two editions of a text)
+    near = PARAGRAPH.replace(",", ";").replace("The old", "THE OLD").rstrip(".") + "!"
+    cleaned, report = strip_boilerplate(f"{PARAGRAPH}\n\n{near}\n\n{PARAGRAPH}")
+    assert cleaned.count("lighthouse keeper") == 1
+    assert report["near_duplicate_blocks"] == 1
+    assert report["duplicate_blocks"] == 1
+
+
+def test_threshold_one_keeps_near_duplicates():
+    near = PARAGRAPH.replace(",", ";")
+    cleaned, report = strip_boilerplate(f"{PARAGRAPH}\n\n{near}", similarity_threshold=1.0)
+    assert cleaned.count("lighthouse keeper") == 2
+    assert report["near_duplicate_blocks"] == 0